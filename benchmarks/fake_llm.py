@@ -0,0 +1,165 @@
+from typing import Any, AsyncGenerator, Callable, Optional, Sequence, Union
+import asyncio
+import json
+
+from llama_index.core.llms import ChatMessage, ChatResponse, LLMMetadata
+from llama_index.core.tools import ToolSelection
+
+# A scripted turn is either the final text answer, or a list of (tool_name, arguments) calls.
+ScriptedTurn = Union[str, list[tuple[str, dict[str, Any]]]]
+
+
+class ScriptedRateLimitError(Exception):
+    """Raised by ScriptedLLM like a provider's HTTP 429 (Too Many Requests) error."""
+
+    status_code = 429
+
+    def __init__(self, message: str = "Rate limit exceeded"):
+        super().__init__(message)
+        self.message = message
+
+
+class ScriptedLLM:
+    def __init__(
+        self,
+        script: Sequence[ScriptedTurn],
+        latency: Union[float, Callable[[], float]] = 0.0,
+        temperature: float = 0.0,
+        chunk_latency: float = 0.0,
+        max_in_flight: Optional[int] = None,
+    ):
+        """
+        Instantiates a ScriptedLLM object.
+        A local stand-in for the router LLM that replays a fixed script of turns, so the
+        framework can be exercised and benchmarked without network access. The turn to
+        replay is derived from the messages (assistant replies since the last user message),
+        so one instance can serve any number of concurrent sessions.
+
+        Args:
+        - script: Sequence[ScriptedTurn] - tool call turns followed by a final text answer
+        - latency: Union[float, Callable[[], float]] - seconds to wait per call (or a callable returning it)
+        - temperature: float - reported temperature (used by response cache keys)
+        - chunk_latency: float - seconds between streamed chunks
+        - max_in_flight: Optional[int] - concurrent calls accepted, further calls raise ScriptedRateLimitError (None for unlimited)
+        """
+        self.script = list(script)
+        self.latency = latency
+        self.temperature = temperature
+        self.chunk_latency = chunk_latency
+        self.metadata = LLMMetadata(
+            context_window=128000,
+            is_chat_model=True,
+            is_function_calling_model=True,
+            model_name="scripted",
+        )
+        self.max_in_flight = max_in_flight
+        self.calls = 0
+        self.in_flight = 0
+        self.throttled = 0
+
+    def _turn_index(self, messages: Sequence[ChatMessage]) -> int:
+        index = 0
+        for message in reversed(messages):
+            if message.role.value == "user":
+                break
+            if message.role.value == "assistant":
+                index += 1
+        return min(index, len(self.script) - 1)
+
+    def _delay(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    def _respond(self, messages: Sequence[ChatMessage]) -> ChatResponse:
+        turn = self.script[self._turn_index(messages)]
+        if isinstance(turn, str):
+            return ChatResponse(message=ChatMessage(role="assistant", content=turn))
+
+        tool_calls = [
+            ToolSelection(
+                tool_id=f"call_{self.calls}_{i}",
+                tool_name=tool_name,
+                tool_kwargs={"input": json.dumps(arguments)},
+            )
+            for i, (tool_name, arguments) in enumerate(turn)
+        ]
+        return ChatResponse(
+            message=ChatMessage(
+                role="assistant",
+                content="",
+                additional_kwargs={"tool_calls": tool_calls},
+            )
+        )
+
+    async def achat_with_tools(
+        self,
+        tools: Sequence[Any],
+        messages: Sequence[ChatMessage],
+        model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        self.calls += 1
+        if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            self.throttled += 1
+            raise ScriptedRateLimitError()
+        self.in_flight += 1
+        try:
+            delay = self._delay()
+            if delay:
+                await asyncio.sleep(delay)
+            return self._respond(messages)
+        finally:
+            self.in_flight -= 1
+
+    async def astream_chat_with_tools(
+        self,
+        tools: Sequence[Any],
+        messages: Sequence[ChatMessage],
+        model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Streams final answers word by word and tool call turns one tool call at a time."""
+        self.calls += 1
+        response = self._respond(messages)
+
+        async def gen() -> AsyncGenerator[ChatResponse, None]:
+            delay = self._delay()
+            if delay:
+                await asyncio.sleep(delay)
+            tool_calls = response.message.additional_kwargs.get("tool_calls")
+            if tool_calls:
+                # Each chunk carries the tool calls streamed so far, like a provider would.
+                for i in range(1, len(tool_calls) + 1):
+                    if i > 1 and self.chunk_latency:
+                        await asyncio.sleep(self.chunk_latency)
+                    yield ChatResponse(
+                        message=ChatMessage(
+                            role="assistant",
+                            content="",
+                            additional_kwargs={"tool_calls": tool_calls[:i]},
+                        )
+                    )
+                return
+            content = ""
+            for i, word in enumerate(response.message.content.split(" ")):
+                if i and self.chunk_latency:
+                    await asyncio.sleep(self.chunk_latency)
+                delta = word if i == 0 else " " + word
+                content += delta
+                yield ChatResponse(
+                    message=ChatMessage(role="assistant", content=content),
+                    delta=delta,
+                )
+
+        return gen()
+
+    def get_tool_calls_from_response(
+        self,
+        response: ChatResponse,
+        error_on_no_tool_call: bool = True,
+        **kwargs: Any,
+    ) -> list[ToolSelection]:
+        tool_calls = response.message.additional_kwargs.get("tool_calls", [])
+        if not tool_calls and error_on_no_tool_call:
+            raise ValueError("Expected at least one tool call, but got 0 tool calls.")
+        # Copies, since the router consumes tool_kwargs in place.
+        return [tool_call.model_copy(deep=True) for tool_call in tool_calls]
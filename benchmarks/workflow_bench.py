@@ -0,0 +1,229 @@
+"""
+Offline throughput and latency benchmark for AgentFlowOpenAI.
+
+Runs the workflow against a ScriptedLLM (no network) and prints machine-readable JSON:
+
+    PYTHONPATH=. python -m benchmarks.workflow_bench --runs 200 --concurrency 20
+"""
+
+from typing import Any, Optional, Sequence
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from llama_index.core.workflow import StartEvent, StopEvent
+
+from benchmarks.fake_llm import ScriptedLLM, ScriptedTurn
+from src.agents.router import AgentFlowOpenAI, TokenDeltaEvent, ToolCallEvent
+from src.skills.base import FunctionCallSkillAsync, SkillArgAttr, SkillMap
+
+
+class Echo(FunctionCallSkillAsync):
+    def __init__(self, latency: float = 0.0):
+        super().__init__(
+            name="echo",
+            description="Echo the text back",
+            function_args=[
+                SkillArgAttr(
+                    name="text",
+                    description="Text to echo",
+                    dtype="str",
+                    required=True,
+                )
+            ],
+        )
+        self.latency = latency
+
+    async def execute(self, text: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return text
+
+
+def build_script(turns: int, tool_calls_per_turn: int) -> list[ScriptedTurn]:
+    script: list[ScriptedTurn] = [
+        [("echo", {"text": f"turn {t} call {c}"}) for c in range(tool_calls_per_turn)]
+        for t in range(turns)
+    ]
+    script.append("all tool calls are done")
+    return script
+
+
+def percentiles(samples: Sequence[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pick(0.50) * 1000,
+        "p95_ms": pick(0.95) * 1000,
+        "p99_ms": pick(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def measure_steps(
+    workflow: AgentFlowOpenAI, runs: int
+) -> dict[str, dict[str, float]]:
+    """Drives the workflow steps directly so each step's own latency can be timed."""
+    samples: dict[str, list[float]] = {
+        "prepare_agent": [],
+        "router": [],
+        "tool_call_handler": [],
+    }
+    for i in range(runs):
+        start = time.perf_counter()
+        ev = await workflow.prepare_agent(
+            StartEvent(input=f"request {i}", session_id=f"steps {i}")
+        )
+        samples["prepare_agent"].append(time.perf_counter() - start)
+        while True:
+            start = time.perf_counter()
+            ev = await workflow.router(ev)
+            samples["router"].append(time.perf_counter() - start)
+            if isinstance(ev, StopEvent):
+                break
+            assert isinstance(ev, ToolCallEvent)
+            start = time.perf_counter()
+            ev = await workflow.tool_call_handler(ev)
+            samples["tool_call_handler"].append(time.perf_counter() - start)
+    return {step: percentiles(values) for step, values in samples.items()}
+
+
+async def measure_end_to_end(
+    workflow: AgentFlowOpenAI, runs: int, concurrency: int
+) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    first_token_latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            handler = workflow.run(input=f"request {i}", session_id=f"e2e {i}")
+            if workflow.stream:
+                first_token = None
+                async for ev in handler.stream_events():
+                    if isinstance(ev, TokenDeltaEvent) and first_token is None:
+                        first_token = time.perf_counter() - start
+                        first_token_latencies.append(first_token)
+            await handler
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    elapsed = time.perf_counter() - start
+    return {
+        "latency": percentiles(latencies),
+        "time_to_first_token": percentiles(first_token_latencies),
+        "elapsed_s": elapsed,
+        "workflows_per_s": runs / elapsed if elapsed else 0.0,
+    }
+
+
+async def measure_session_memory(workflow: AgentFlowOpenAI, sessions: int) -> float:
+    """Average bytes retained per completed session."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(sessions):
+        await workflow.run(input=f"request {i}", session_id=f"memory {i}")
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return retained / sessions if sessions else 0.0
+
+
+async def run_benchmark(
+    runs: int = 100,
+    concurrency: int = 10,
+    turns: int = 1,
+    tool_calls_per_turn: int = 2,
+    llm_latency: float = 0.0,
+    skill_latency: float = 0.0,
+    memory_sessions: int = 50,
+    stream: bool = False,
+    chunk_latency: float = 0.0,
+) -> dict[str, Any]:
+    llm = ScriptedLLM(
+        build_script(turns, tool_calls_per_turn),
+        latency=llm_latency,
+        chunk_latency=chunk_latency,
+    )
+    skill_map = SkillMap(skills=[Echo(latency=skill_latency)])
+    workflow = AgentFlowOpenAI(
+        llm=llm,
+        skill_map=skill_map,
+        max_sessions=max(runs, memory_sessions) * 3,
+        token_limit=100000,
+        stream=stream,
+    )
+    return {
+        "config": {
+            "runs": runs,
+            "concurrency": concurrency,
+            "turns": turns,
+            "tool_calls_per_turn": tool_calls_per_turn,
+            "llm_latency_s": llm_latency,
+            "skill_latency_s": skill_latency,
+            "memory_sessions": memory_sessions,
+            "stream": stream,
+            "chunk_latency_s": chunk_latency,
+        },
+        "steps": await measure_steps(workflow, runs),
+        "end_to_end": await measure_end_to_end(workflow, runs, concurrency),
+        "memory_per_session_bytes": await measure_session_memory(
+            workflow, memory_sessions
+        ),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=1)
+    parser.add_argument("--tool-calls-per-turn", type=int, default=2)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--skill-latency", type=float, default=0.0)
+    parser.add_argument("--memory-sessions", type=int, default=50)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--chunk-latency", type=float, default=0.0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(
+        run_benchmark(
+            runs=args.runs,
+            concurrency=args.concurrency,
+            turns=args.turns,
+            tool_calls_per_turn=args.tool_calls_per_turn,
+            llm_latency=args.llm_latency,
+            skill_latency=args.skill_latency,
+            memory_sessions=args.memory_sessions,
+            stream=args.stream,
+            chunk_latency=args.chunk_latency,
+        )
+    )
+    serialized = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(serialized + "\n")
+    else:
+        sys.stdout.write(serialized + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -41,11 +41,11 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 llm = OpenAI(api_key=OPENAI_API_KEY, temperature=0.1)
 skillmap = SkillMap(skills=[Multiply()])
+workflow = AgentFlowOpenAI(llm=llm, skill_map=skillmap, model="gpt-4o")
 
 
-async def example_test(input: str) -> str:
-    workflow = AgentFlowOpenAI(llm=llm, skill_map=skillmap, model="gpt-4o")
-    res = await workflow.run(input=input)
+async def example_test(input: str, session_id: str = "example") -> str:
+    res = await workflow.run(input=input, session_id=session_id)
     return res
 
 
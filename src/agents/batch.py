@@ -0,0 +1,146 @@
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Optional, TextIO, Union
+import asyncio
+import json
+import os
+
+from llama_index.core.workflow import Workflow
+
+# A batch input is either the user input, or the keyword arguments for Workflow.run.
+BatchInput = Union[str, dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """
+    Outcome of one batch input.
+
+    Attributes:
+    - index: int - position of the input in the batch
+    - result: Any - the workflow result (None if it failed)
+    - error: Optional[str] - "{Type}: {message}" if the workflow raised
+    """
+
+    index: int
+    result: Any = None
+    error: Optional[str] = None
+
+
+def load_checkpoint(path: str) -> dict[int, BatchResult]:
+    """
+    Reads the results recorded in a batch checkpoint file.
+    A partially written last line (e.g. from a crash mid-write) is ignored.
+
+    Args:
+    - path: str - checkpoint file (JSON lines)
+
+    Returns:
+    - dict[int, BatchResult] - recorded results by input index
+    """
+    completed: dict[int, BatchResult] = dict()
+    if not os.path.exists(path):
+        return completed
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            completed[record["index"]] = BatchResult(**record)
+    return completed
+
+
+def _open_checkpoint(path: str) -> TextIO:
+    # Drop a partially written last line, so appended records start on a line of their own.
+    checkpoint = open(path, "a+b")
+    checkpoint.seek(0)
+    content = checkpoint.read()
+    if content and not content.endswith(b"\n"):
+        checkpoint.truncate(content.rfind(b"\n") + 1)
+    checkpoint.close()
+    return open(path, "a", encoding="utf-8")
+
+
+async def _enumerate_inputs(
+    inputs: Union[Iterable[BatchInput], AsyncIterable[BatchInput]]
+) -> AsyncIterator[tuple[int, BatchInput]]:
+    if isinstance(inputs, AsyncIterable):
+        index = 0
+        async for item in inputs:
+            yield index, item
+            index += 1
+    else:
+        for index, item in enumerate(inputs):
+            yield index, item
+
+
+async def run_batch(
+    workflow: Workflow,
+    inputs: Union[Iterable[BatchInput], AsyncIterable[BatchInput]],
+    concurrency: int = 8,
+    checkpoint_path: Optional[str] = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Runs a workflow over many independent inputs, at most concurrency at a time.
+    Inputs are consumed lazily, so the batch can be larger than memory. Every run shares
+    the workflow (its LLM client, tool registry and caches); each input gets its own
+    session, discarded once the run completes, unless the input passes a session_id.
+
+    With checkpoint_path, each result is appended to the file as it completes, and inputs
+    already recorded there are skipped, so a restarted batch resumes where it stopped.
+
+    Args:
+    - workflow: Workflow - e.g. an AgentFlowOpenAI
+    - inputs: Union[Iterable[BatchInput], AsyncIterable[BatchInput]] - user inputs, or run() keyword arguments
+    - concurrency: int - maximum number of runs in flight
+    - checkpoint_path: Optional[str] - JSON lines file recording completed results
+
+    Returns:
+    - AsyncIterator[BatchResult] - results in completion order, with their input index
+    """
+    completed = load_checkpoint(checkpoint_path) if checkpoint_path else dict()
+    checkpoint = _open_checkpoint(checkpoint_path) if checkpoint_path else None
+    sessions = getattr(workflow, "sessions", None)
+
+    async def run_one(index: int, item: BatchInput) -> BatchResult:
+        kwargs = dict(item) if isinstance(item, dict) else {"input": item}
+        owns_session = sessions is not None and "session_id" not in kwargs
+        if owns_session:
+            kwargs["session_id"] = ("batch", index)
+        try:
+            return BatchResult(index=index, result=await workflow.run(**kwargs))
+        except Exception as e:
+            return BatchResult(index=index, error=f"{type(e).__name__}: {e}")
+        finally:
+            if owns_session:
+                sessions.pop(kwargs["session_id"])
+
+    pending: set[asyncio.Task] = set()
+    items = _enumerate_inputs(inputs).__aiter__()
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    index, item = await items.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                if index not in completed:
+                    pending.add(asyncio.create_task(run_one(index, item)))
+            if not pending:
+                continue
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result = task.result()
+                if checkpoint is not None:
+                    checkpoint.write(json.dumps(asdict(result), default=str) + "\n")
+                    checkpoint.flush()
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if checkpoint is not None:
+            checkpoint.close()
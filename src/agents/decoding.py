@@ -0,0 +1,127 @@
+from typing import Any, Callable, Union
+import json
+import re
+
+from src.agents.errors import ToolArgumentDecodeException
+
+try:  # orjson is optional, the standard library parser is used without it
+    import orjson
+
+    _loads: Callable[[str], Any] = orjson.loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+DEFAULT_MAX_ARGUMENT_CHARS = 256_000
+MAX_ARGUMENT_DEPTH = 64
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _repair(text: str) -> str:
+    """Best-effort fixes for common LLM formatting slips: code fences, prose and trailing commas."""
+    text = _CODE_FENCE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start : end + 1]
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def _exceeds_depth(text: str, max_depth: int) -> bool:
+    # Only scan when there are enough brackets for the depth to possibly be exceeded.
+    if text.count("{") + text.count("[") <= max_depth:
+        return False
+    depth = 0
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+            if depth > max_depth:
+                return True
+        elif char in "}]":
+            depth -= 1
+    return False
+
+
+def _parse_object(text: str, max_chars: int) -> dict[str, Any]:
+    if len(text) > max_chars:
+        raise ToolArgumentDecodeException(
+            f"Error: tool arguments are too large ({len(text)} characters, the limit is {max_chars}).",
+            reason="too_large",
+        )
+    # Deeply nested input can exhaust the parser's stack (and crash some orjson versions).
+    if _exceeds_depth(text, MAX_ARGUMENT_DEPTH):
+        raise ToolArgumentDecodeException(
+            f"Error: tool arguments are nested more than {MAX_ARGUMENT_DEPTH} levels deep.",
+            reason="too_deep",
+        )
+    try:
+        value = _loads(text)
+    except ValueError:
+        try:
+            value = _loads(_repair(text))
+        except ValueError as e:
+            raise ToolArgumentDecodeException(
+                f'Error: tool arguments are not valid JSON ({e}). Provide them as a JSON object, e.g. {{"input": {{"arg1": "value1"}}}}.',
+                reason="invalid_json",
+            )
+    if not isinstance(value, dict):
+        raise ToolArgumentDecodeException(
+            f"Error: tool arguments must be a JSON object, got {type(value).__name__}.",
+            reason="not_an_object",
+        )
+    return value
+
+
+def decode_tool_arguments(
+    tool_kwargs: Union[dict[str, Any], str],
+    max_chars: int = DEFAULT_MAX_ARGUMENT_CHARS,
+) -> dict[str, Any]:
+    """
+    Decodes the tool arguments produced by the LLM into the router input format
+    expected by FunctionCallSkill.handle_router_input: {"input": {...}}.
+
+    Accepts arguments that are already parsed ({"input": {...}} or the bare arguments),
+    or JSON strings (either the whole arguments or the value of "input"). Already parsed
+    dicts are used as-is, without a serialisation round trip. tool_kwargs is not modified.
+
+    Args:
+    - tool_kwargs: Union[dict[str, Any], str] - tool arguments from the LLM
+    - max_chars: int - maximum size of a JSON string to parse
+
+    Returns:
+    - dict[str, Any] - {"input": {...}}
+
+    Raises:
+    - ToolArgumentDecodeException - if the arguments can't be decoded, message is suitable for the LLM
+    """
+    if isinstance(tool_kwargs, str):
+        tool_kwargs = _parse_object(tool_kwargs, max_chars)
+    elif not isinstance(tool_kwargs, dict):
+        raise ToolArgumentDecodeException(
+            f"Error: tool arguments must be a JSON object, got {type(tool_kwargs).__name__}.",
+            reason="not_an_object",
+        )
+
+    if "input" not in tool_kwargs:
+        return {"input": tool_kwargs}
+
+    arguments = tool_kwargs["input"]
+    if isinstance(arguments, str):
+        arguments = _parse_object(arguments, max_chars)
+    elif not isinstance(arguments, dict):
+        raise ToolArgumentDecodeException(
+            f'Error: "input" must be a JSON object, got {type(arguments).__name__}.',
+            reason="not_an_object",
+        )
+    return {"input": arguments}
@@ -0,0 +1,5 @@
+class ToolArgumentDecodeException(Exception):
+    def __init__(self, message, reason: str = "invalid"):
+        self.message = message
+        self.reason = reason
+        super().__init__(self.message)
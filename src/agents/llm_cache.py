@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+
+from llama_index.core.llms import ChatMessage, ChatResponse
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return repr(value)
+
+
+def response_cache_key(
+    model: str,
+    messages: Sequence[ChatMessage],
+    tools_fingerprint: str,
+    temperature: Optional[float] = None,
+) -> str:
+    """
+    Builds a stable, content-addressed key for an LLM chat call.
+
+    Args:
+    - model: str - model name
+    - messages: Sequence[ChatMessage] - messages sent to the LLM
+    - tools_fingerprint: str - hash of the tool schemas offered to the LLM
+    - temperature: Optional[float] - sampling temperature
+
+    Returns:
+    - str - sha256 hex digest
+    """
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "tools": tools_fingerprint,
+        "messages": [
+            {
+                "role": message.role.value,
+                "content": message.content,
+                "additional_kwargs": message.additional_kwargs,
+            }
+            for message in messages
+        ],
+    }
+    serialized = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), default=_json_default
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_size: int = 1024, path: Optional[str] = None):
+        """
+        Instantiates a ResponseCache object.
+        Caches LLM chat responses by content-addressed key in an in-memory LRU tier and,
+        if path is given, an on-disk SQLite tier that survives restarts (e.g. to replay
+        conversations offline in CI). Only point path at files you trust, responses are
+        stored pickled.
+
+        Args:
+        - max_size: int - maximum number of responses in the in-memory tier
+        - path: Optional[str] - SQLite database file for the on-disk tier
+        """
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, ChatResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response BLOB NOT NULL)"
+            )
+            self._connection.commit()
+
+    def _remember(self, key: str, response: ChatResponse) -> None:
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[ChatResponse]:
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+            elif self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT response FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response = pickle.loads(row[0])
+                    self._remember(key, response)
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return response
+
+    def put(self, key: str, response: ChatResponse) -> None:
+        with self._lock:
+            self._remember(key, response)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                    (key, pickle.dumps(response)),
+                )
+                self._connection.commit()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._memory)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,202 @@
+from typing import Any, Callable, List, Optional
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory import BaseMemory
+from llama_index.core.utils import get_tokenizer
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+# Combines the previous summary (if any) with messages leaving the window into a new summary.
+Summarizer = Callable[[Optional[str], List[ChatMessage]], str]
+
+
+def digest_message(message: ChatMessage, max_chars: int = 200) -> str:
+    """
+    Returns a one line digest of a message, with long content cut to max_chars.
+
+    Args:
+    - message: ChatMessage - the message to digest
+    - max_chars: int - maximum number of content characters kept
+
+    Returns:
+    - str - the digest
+    """
+    content = " ".join(str(message.content or "").split())
+    if len(content) > max_chars:
+        content = f"{content[:max_chars]}... [{len(content)} chars]"
+    if message.role == MessageRole.TOOL:
+        prefix = f"tool result {message.additional_kwargs.get('tool_call_id', '')}:"
+        # Tool messages already collapsed by CompactingMemory are digests themselves.
+        return content if content.startswith(prefix) else f"{prefix} {content}"
+    if message.role == MessageRole.ASSISTANT and not content:
+        return "assistant: (called tools)"
+    return f"{message.role.value}: {content}"
+
+
+def digest_summarizer(summary: Optional[str], messages: List[ChatMessage]) -> str:
+    """Extractive summarizer, appends one digest line per message. Needs no LLM call."""
+    lines = [summary] if summary else []
+    lines.extend(digest_message(message) for message in messages)
+    return "\n".join(lines)
+
+
+class CompactingMemory(BaseMemory):
+    """
+    Conversation memory with incremental token accounting and history compaction.
+
+    Token counts are computed once per message when it is put, so get() doesn't
+    re-tokenize the history. When the history exceeds token_limit, the oldest turns
+    are folded into a rolling summary (tool outputs reduced to digests) that is
+    returned ahead of the recent messages, keeping the prompt size roughly constant.
+    """
+
+    token_limit: int = Field(default=3000, gt=0)
+    summary_token_limit: int = Field(default=500, ge=0)
+    tool_digest_chars: int = Field(default=200, gt=0)
+    tokenizer_fn: Callable[[str], List] = Field(default_factory=get_tokenizer, exclude=True)
+    summarizer: Summarizer = Field(default=digest_summarizer, exclude=True)
+
+    _messages: List[ChatMessage] = PrivateAttr(default_factory=list)
+    _token_counts: List[int] = PrivateAttr(default_factory=list)
+    _digested: List[bool] = PrivateAttr(default_factory=list)
+    _window_tokens: int = PrivateAttr(default=0)
+    _summary: Optional[str] = PrivateAttr(default=None)
+    _summary_tokens: int = PrivateAttr(default=0)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CompactingMemory"
+
+    @classmethod
+    def from_defaults(
+        cls,
+        llm: Any = None,
+        token_limit: Optional[int] = None,
+        tokenizer_fn: Optional[Callable[[str], List]] = None,
+        **kwargs: Any,
+    ) -> "CompactingMemory":
+        if token_limit is None:
+            token_limit = (
+                int(llm.metadata.context_window * 0.75) if llm is not None else 3000
+            )
+        return cls(
+            token_limit=token_limit,
+            tokenizer_fn=tokenizer_fn or get_tokenizer(),
+            **kwargs,
+        )
+
+    def _count(self, text: str) -> int:
+        return len(self.tokenizer_fn(text)) if text else 0
+
+    @property
+    def token_count(self) -> int:
+        """Tokens returned by get(), summary included."""
+        return self._window_tokens + self._summary_tokens
+
+    @property
+    def summary(self) -> Optional[str]:
+        return self._summary
+
+    def get(self, input: Optional[str] = None, **kwargs: Any) -> List[ChatMessage]:
+        if self._summary is None:
+            return list(self._messages)
+        summary_message = ChatMessage(
+            role="system", content=f"{SUMMARY_PREFIX}\n{self._summary}"
+        )
+        return [summary_message, *self._messages]
+
+    def get_all(self) -> List[ChatMessage]:
+        return self.get()
+
+    def put(self, message: ChatMessage) -> None:
+        count = self._count(str(message.content or ""))
+        self._messages.append(message)
+        self._token_counts.append(count)
+        self._digested.append(False)
+        self._window_tokens += count
+        if self.token_count > self.token_limit:
+            self._compact()
+
+    def set(self, messages: List[ChatMessage]) -> None:
+        self.reset()
+        for message in messages:
+            self.put(message)
+
+    def reset(self) -> None:
+        self._messages = []
+        self._token_counts = []
+        self._digested = []
+        self._window_tokens = 0
+        self._summary = None
+        self._summary_tokens = 0
+
+    def _compact(self) -> None:
+        evicted: List[ChatMessage] = []
+        # Evict whole turns (a user message and everything up to the next one), so the
+        # window never starts with an assistant or orphaned tool message. The window is
+        # brought down to leave room for the summary, so compaction doesn't run every put.
+        window_limit = self.token_limit - self.summary_token_limit
+        while self._window_tokens > window_limit:
+            next_turn = next(
+                (
+                    i
+                    for i in range(1, len(self._messages))
+                    if self._messages[i].role == MessageRole.USER
+                ),
+                None,
+            )
+            if next_turn is None:
+                break
+            evicted.extend(self._messages[:next_turn])
+            self._window_tokens -= sum(self._token_counts[:next_turn])
+            del self._messages[:next_turn]
+            del self._token_counts[:next_turn]
+            del self._digested[:next_turn]
+
+        if evicted:
+            self._set_summary(self.summarizer(self._summary, evicted))
+
+        # Only the current turn is left: collapse tool outputs the LLM has already
+        # seen (followed by an assistant message) to digests.
+        if self.token_count > self.token_limit:
+            last_assistant = max(
+                (
+                    i
+                    for i, message in enumerate(self._messages)
+                    if message.role == MessageRole.ASSISTANT
+                ),
+                default=-1,
+            )
+            for i in range(last_assistant):
+                if self.token_count <= self.token_limit:
+                    break
+                message = self._messages[i]
+                if (
+                    message.role != MessageRole.TOOL
+                    or self._digested[i]
+                    or len(str(message.content or "")) <= self.tool_digest_chars
+                ):
+                    continue
+                content = digest_message(message, self.tool_digest_chars)
+                count = self._count(content)
+                self._window_tokens += count - self._token_counts[i]
+                self._messages[i] = ChatMessage(
+                    role=message.role,
+                    content=content,
+                    additional_kwargs=message.additional_kwargs,
+                )
+                self._token_counts[i] = count
+                self._digested[i] = True
+
+    def _set_summary(self, summary: str) -> None:
+        # Roll the summary: drop its oldest lines until it fits summary_token_limit.
+        lines = summary.split("\n")
+        counts = [self._count(line) for line in lines]
+        total = sum(counts) + self._count(SUMMARY_PREFIX)
+        start = 0
+        while total > self.summary_token_limit and start < len(lines):
+            total -= counts[start]
+            start += 1
+        self._summary = "\n".join(lines[start:]) if start < len(lines) else None
+        self._summary_tokens = total if self._summary is not None else 0
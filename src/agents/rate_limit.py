@@ -0,0 +1,317 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence, TypeVar
+import asyncio
+import random
+import time
+
+from llama_index.core.llms import ChatMessage
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+THROTTLE_STATUS_CODES = frozenset({429})
+
+
+@dataclass(frozen=True)
+class ModelBudget:
+    """
+    Client-side rate budget for one model.
+
+    Attributes:
+    - requests_per_minute: Optional[float] - request budget (None for unlimited)
+    - tokens_per_minute: Optional[float] - token budget, prompt and completion (None for unlimited)
+    """
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+def estimate_tokens(messages: Sequence[ChatMessage], completion_tokens: int = 256) -> int:
+    """Rough token estimate of a chat call (about 4 characters per token) used before the real usage is known."""
+    return sum(len(str(message.content or "")) for message in messages) // 4 + completion_tokens
+
+
+def response_usage(response: Any) -> dict[str, int]:
+    """Returns the token usage reported by the provider for a ChatResponse (prompt_tokens, completion_tokens, total_tokens), if any."""
+    raw = getattr(response, "raw", None)
+    usage = raw.get("usage") if isinstance(raw, dict) else getattr(raw, "usage", None)
+    if usage is None:
+        return dict()
+    if not isinstance(usage, dict):
+        usage = {
+            key: getattr(usage, key, None)
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens")
+        }
+    return {key: value for key, value in usage.items() if isinstance(value, int)}
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Returns the total tokens reported by the provider for a ChatResponse, if any."""
+    return response_usage(response).get("total_tokens")
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        """
+        Instantiates a TokenBucket object, holding up to per_minute units and refilling
+        continuously at per_minute units per minute.
+
+        Args:
+        - per_minute: float - capacity and refill rate
+        - clock: Callable[[], float] - monotonic clock in seconds
+        - sleep: Callable[[float], Awaitable[Any]] - async sleep
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        """Waits until amount units are available and takes them, in arrival order."""
+        # Requests larger than the whole bucket go through once it is full, rather than never.
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.level < amount:
+                await self._sleep((amount - self.level) / self.rate)
+                self._refill()
+            self.level -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Takes (or gives back, if negative) units after the fact, e.g. to correct a token estimate."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Instantiates an AdaptiveConcurrency object, a concurrency limit adjusted AIMD-style:
+        it grows by about one slot per limit's worth of successful calls and is multiplied
+        by decrease_factor whenever the provider throttles.
+
+        Args:
+        - initial: int - starting limit
+        - minimum: int - lowest limit
+        - maximum: int - highest limit
+        - decrease_factor: float - multiplier applied to the limit on throttling
+        """
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveConcurrency":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+
+
+class _ModelState:
+    def __init__(self, budget: ModelBudget, limiter: "RateLimiter"):
+        self.requests = (
+            TokenBucket(budget.requests_per_minute, limiter._clock, limiter._sleep)
+            if budget.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(budget.tokens_per_minute, limiter._clock, limiter._sleep)
+            if budget.tokens_per_minute
+            else None
+        )
+        self.concurrency = AdaptiveConcurrency(
+            initial=limiter.initial_concurrency,
+            minimum=limiter.min_concurrency,
+            maximum=limiter.max_concurrency,
+            decrease_factor=limiter.decrease_factor,
+        )
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        default_budget: ModelBudget = ModelBudget(),
+        budgets: Optional[dict[str, ModelBudget]] = None,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        decrease_factor: float = 0.5,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retryable_status_codes: frozenset[int] = RETRYABLE_STATUS_CODES,
+        retry_on: tuple[type[BaseException], ...] = (ConnectionError, TimeoutError),
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        """
+        Instantiates a RateLimiter object.
+        A client-side limiter for LLM calls: per model it spends requests/min and tokens/min
+        budgets (token buckets), caps concurrency adaptively (halved on throttling, grown
+        back slowly on success) and retries retryable errors (429, 5xx, connection errors)
+        with full-jitter exponential backoff, honouring Retry-After when the provider sends it.
+
+        Args:
+        - default_budget: ModelBudget - budget of models not listed in budgets
+        - budgets: Optional[dict[str, ModelBudget]] - budgets by model name
+        - initial_concurrency: int - starting concurrency limit per model
+        - min_concurrency: int - lowest concurrency limit per model
+        - max_concurrency: int - highest concurrency limit per model
+        - decrease_factor: float - multiplier applied to the concurrency limit on throttling
+        - max_retries: int - retries before the error is raised
+        - base_delay: float - backoff of the first retry, in seconds (doubled each retry)
+        - max_delay: float - maximum backoff, in seconds
+        - retryable_status_codes: frozenset[int] - HTTP status codes worth retrying
+        - retry_on: tuple[type[BaseException], ...] - exception types worth retrying
+        - clock: Callable[[], float] - monotonic clock in seconds
+        - sleep: Callable[[float], Awaitable[Any]] - async sleep
+        """
+        self.default_budget = default_budget
+        self.budgets = dict(budgets or {})
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable_status_codes = retryable_status_codes
+        self.retry_on = retry_on
+        self._clock = clock
+        self._sleep = sleep
+        self._models: dict[str, _ModelState] = dict()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = _ModelState(self.budgets.get(model, self.default_budget), self)
+            self._models[model] = state
+        return state
+
+    def is_retryable(self, error: BaseException) -> bool:
+        return isinstance(error, self.retry_on) or _status_code(error) in self.retryable_status_codes
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based): Retry-After if given, else full jitter."""
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def concurrency_limit(self, model: str) -> int:
+        return int(self._state(model).concurrency.limit)
+
+    async def call(
+        self,
+        model: str,
+        function: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        usage: Callable[[T], Optional[int]] = usage_tokens,
+    ) -> T:
+        """
+        Runs an LLM call within the model's budgets, retrying retryable errors.
+
+        Args:
+        - model: str - model name, selects the budget
+        - function: Callable[[], Awaitable[T]] - makes the call (invoked again on each retry)
+        - estimated_tokens: int - tokens spent from the budget up front
+        - usage: Callable[[T], Optional[int]] - reads the actual tokens used from the result, to correct the estimate
+
+        Returns:
+        - T - the call's result
+
+        Raises:
+        - the last error, once it isn't retryable or max_retries is exhausted
+        """
+        state = self._state(model)
+        self.calls += 1
+        attempt = 0
+        while True:
+            if state.requests is not None:
+                await state.requests.acquire(1)
+            if state.tokens is not None:
+                # Also waits out token debt left by calls that used more than estimated.
+                await state.tokens.acquire(estimated_tokens)
+            try:
+                async with state.concurrency:
+                    result = await function()
+            except Exception as e:
+                throttled = _status_code(e) in THROTTLE_STATUS_CODES
+                if throttled:
+                    self.throttled += 1
+                    state.concurrency.on_throttle()
+                if not self.is_retryable(e) or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                await self._sleep(self.backoff(attempt, e))
+                attempt += 1
+                continue
+            state.concurrency.on_success()
+            actual = usage(result)
+            if state.tokens is not None and actual is not None:
+                state.tokens.adjust(actual - estimated_tokens)
+            return result
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "concurrency_limits": {
+                model: int(state.concurrency.limit) for model, state in self._models.items()
+            },
+        }
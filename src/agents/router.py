@@ -1,23 +1,56 @@
-from typing import Union
+from collections.abc import Hashable
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Union
+import asyncio
 import inspect
 
-from llama_index.core.llms import ChatMessage
-from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.core.tools import FunctionTool, ToolMetadata, ToolSelection
-from llama_index.core.workflow import Event, StartEvent, StopEvent, Workflow, step
+from llama_index.core.llms import ChatMessage, ChatResponse
+from llama_index.core.memory import BaseMemory, ChatMemoryBuffer
+from llama_index.core.tools import FunctionTool, ToolSelection
+from llama_index.core.workflow import (
+    Context,
+    Event,
+    StartEvent,
+    StopEvent,
+    Workflow,
+    step,
+)
 from llama_index.llms.openai import OpenAI
 from openinference.instrumentation import using_prompt_template
+from opentelemetry.trace import StatusCode
 
+from src.agents.batch import BatchInput, BatchResult, run_batch
+from src.agents.decoding import DEFAULT_MAX_ARGUMENT_CHARS, decode_tool_arguments
+from src.agents.errors import ToolArgumentDecodeException
+from src.agents.llm_cache import ResponseCache, response_cache_key
+from src.agents.rate_limit import RateLimiter, estimate_tokens, response_usage
+from src.agents.sessions import DEFAULT_SESSION_ID, SessionStore
+from src.agents.telemetry import COUNT_BUCKETS, DEFAULT_TELEMETRY, Telemetry, traced_step
+from src.agents.tool_selection import ToolSelector, ToolSubset
+from src.agents.tools import get_tool_registry
 from src.prompt_templates.router_template import SYSTEM_PROMPT
 from src.skills.base import SkillMap
+from src.skills.errors import SkillTimeoutException
+from src.skills.execution import DEFAULT_SKILL_EXECUTOR, SkillExecutor
+from src.skills.results import READ_TOOL_RESULT_SKILL_NAME, ResultStore
+
+
+# Tool results starting with these are counted as failed calls (skill input errors included).
+TOOL_ERROR_PREFIXES = ("Error", "Invalid input")
 
 
 class ToolCallEvent(Event):
     tool_calls: list[ToolSelection]
+    session_id: Hashable = DEFAULT_SESSION_ID
 
 
 class RouterInputEvent(Event):
     input: list[ChatMessage]
+    session_id: Hashable = DEFAULT_SESSION_ID
+
+
+class TokenDeltaEvent(Event):
+    delta: str
+    session_id: Hashable = DEFAULT_SESSION_ID
 
 
 class AgentFlowOpenAI(Workflow):
@@ -29,6 +62,22 @@ class AgentFlowOpenAI(Workflow):
         timeout: int = 300,
         token_limit: int = 1000,
         system_prompt: str = SYSTEM_PROMPT,
+        max_concurrent_tool_calls: int = 8,
+        skill_executor: SkillExecutor = DEFAULT_SKILL_EXECUTOR,
+        session_store: Optional[SessionStore] = None,
+        max_sessions: int = 10000,
+        session_ttl: Optional[float] = 3600.0,
+        response_cache: Optional[ResponseCache] = None,
+        max_argument_chars: int = DEFAULT_MAX_ARGUMENT_CHARS,
+        stream: bool = False,
+        eager_tool_dispatch: bool = False,
+        allow_parallel_tool_calls: bool = True,
+        memory_factory: Optional[Callable[[], BaseMemory]] = None,
+        result_store: Optional[ResultStore] = None,
+        tool_selector: Optional[ToolSelector] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        telemetry: Telemetry = DEFAULT_TELEMETRY,
+        default_skill_timeout: Optional[float] = None,
     ):
         # TODO: Add history to memory as Optional
         super().__init__(timeout=timeout)
@@ -36,32 +85,139 @@ class AgentFlowOpenAI(Workflow):
         self.skill_map = skill_map
         self.model = model
         self.system_prompt = system_prompt
-        self.memory = ChatMemoryBuffer(token_limit=token_limit).from_defaults(llm=llm)
-        self.tools = []
-        for func in self.skill_map.get_function_list():
-            self.tools.append(
-                FunctionTool(
-                    self.skill_map.get_function_callable_by_name(func),
-                    metadata=ToolMetadata(
-                        name=func,
-                        description=self.skill_map.get_function_dict_by_name(
-                            func
-                        ),
-                    ),
-                )
-            )
+        self.max_concurrent_tool_calls = max_concurrent_tool_calls
+        self.skill_executor = skill_executor
+        self.response_cache = response_cache
+        self.max_argument_chars = max_argument_chars
+        self.stream = stream
+        self.eager_tool_dispatch = eager_tool_dispatch
+        self.allow_parallel_tool_calls = allow_parallel_tool_calls
+        # Large tool results are moved out of the transcript, add ReadToolResult(result_store)
+        # to the skill map so the LLM can page through them.
+        self.result_store = result_store
+        # With a ToolSelector only the skills relevant to the current turn are offered.
+        self.tool_selector = tool_selector
+        # Spends per model request/token budgets and retries throttled LLM calls.
+        self.rate_limiter = rate_limiter
+        # Spans and metrics for steps, LLM calls and skills (see src.agents.telemetry).
+        self.telemetry = telemetry
+        # Applies to skills that don't declare their own timeout.
+        self.default_skill_timeout = default_skill_timeout
+        # Tool calls already started while the router's response was streaming, by session.
+        self._dispatched_tool_calls: dict[
+            Hashable, tuple[asyncio.Semaphore, dict[str, asyncio.Task]]
+        ] = dict()
+        # Conversation memory is held per session id (passed as StartEvent.session_id),
+        # so one workflow instance can serve many concurrent conversations.
+        # memory_factory can swap in e.g. CompactingMemory for long sessions.
+        self.sessions = session_store or SessionStore(
+            memory_factory=memory_factory
+            or (
+                lambda: ChatMemoryBuffer.from_defaults(llm=llm, token_limit=token_limit)
+            ),
+            max_sessions=max_sessions,
+            ttl=session_ttl,
+        )
+        # Warm the shared registry so the first request doesn't pay for compiling it.
+        get_tool_registry(self.skill_map)
+
+    @property
+    def memory(self) -> BaseMemory:
+        return self.sessions.get(DEFAULT_SESSION_ID)
+
+    @property
+    def tools(self) -> tuple[FunctionTool, ...]:
+        return get_tool_registry(self.skill_map).tools
+
+    def run_batch(
+        self,
+        inputs: Union[Iterable[BatchInput], AsyncIterable[BatchInput]],
+        concurrency: int = 8,
+        checkpoint_path: Optional[str] = None,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Runs the workflow over many independent inputs with bounded concurrency,
+        yielding results as they complete (see src.agents.batch.run_batch).
+
+        Args:
+        - inputs: Union[Iterable[BatchInput], AsyncIterable[BatchInput]] - user inputs, or run() keyword arguments
+        - concurrency: int - maximum number of runs in flight
+        - checkpoint_path: Optional[str] - JSON lines file to checkpoint to and resume from
+
+        Returns:
+        - AsyncIterator[BatchResult] - results in completion order, with their input index
+        """
+        return run_batch(self, inputs, concurrency, checkpoint_path)
+
+    def _offered_tools(self, messages: list[ChatMessage]) -> ToolSubset:
+        if self.tool_selector is not None:
+            return self.tool_selector.select(self.skill_map, messages)
+        registry = get_tool_registry(self.skill_map)
+        return ToolSubset(tools=registry.tools, fingerprint=registry.fingerprint)
 
     @step
+    @traced_step
     async def prepare_agent(self, ev: StartEvent) -> RouterInputEvent:
         user_input = ev.input  # TODO: Understand StartEvent better and resolve this
+        session_id = ev.get("session_id", DEFAULT_SESSION_ID)
+        memory = self.sessions.get(session_id)
         user_msg = ChatMessage(role="user", content=user_input)
-        self.memory.put(user_msg)
+        memory.put(user_msg)
 
-        chat_history = self.memory.get()
-        return RouterInputEvent(input=chat_history)
+        chat_history = memory.get()
+        return RouterInputEvent(input=chat_history, session_id=session_id)
+
+    async def _stream_chat(
+        self,
+        messages: list[ChatMessage],
+        tools: tuple[FunctionTool, ...],
+        ctx: Optional[Context],
+        session_id: Hashable,
+    ) -> ChatResponse:
+        # Text deltas are published until the response turns out to be a tool call,
+        # so only final answers are streamed to the user.
+        response = ChatResponse(message=ChatMessage(role="assistant", content=""))
+        streaming_text = True
+        semaphore = asyncio.Semaphore(self.max_concurrent_tool_calls)
+        dispatched: dict[str, asyncio.Task] = dict()
+        chunks = await self.llm.astream_chat_with_tools(
+            model=self.model,
+            messages=messages,
+            tools=tools,
+            allow_parallel_tool_calls=self.allow_parallel_tool_calls,
+        )
+        async for response in chunks:
+            streamed_tool_calls = response.message.additional_kwargs.get("tool_calls")
+            if streaming_text and streamed_tool_calls:
+                streaming_text = False
+            if streaming_text and response.delta and ctx is not None:
+                ctx.write_event_to_stream(
+                    TokenDeltaEvent(delta=response.delta, session_id=session_id)
+                )
+            # Once a later tool call starts streaming, the earlier ones are complete and
+            # can run while the rest of the response is still being generated.
+            if (
+                self.eager_tool_dispatch
+                and streamed_tool_calls
+                and len(streamed_tool_calls) > len(dispatched) + 1
+            ):
+                tool_calls = self.llm.get_tool_calls_from_response(
+                    response, error_on_no_tool_call=False
+                )
+                for tool_call in tool_calls[:-1]:
+                    if tool_call.tool_id not in dispatched:
+                        dispatched[tool_call.tool_id] = asyncio.create_task(
+                            self._call_tool(tool_call, semaphore)
+                        )
+        if dispatched:
+            self._dispatched_tool_calls[session_id] = (semaphore, dispatched)
+        return response
 
     @step
-    async def router(self, ev: RouterInputEvent) -> Union[ToolCallEvent, StopEvent]:
+    @traced_step
+    async def router(
+        self, ev: RouterInputEvent, ctx: Context = None
+    ) -> Union[ToolCallEvent, StopEvent]:
         messages = ev.input
 
         if not any(
@@ -71,56 +227,175 @@ class AgentFlowOpenAI(Workflow):
             system_prompt = ChatMessage(role="system", content=self.system_prompt)
             messages.insert(0, system_prompt)
 
-        with using_prompt_template(template=self.system_prompt, version="v0.1"):
-            response = await self.llm.achat_with_tools(
+        offered = self._offered_tools(messages)
+        response = None
+        if self.response_cache is not None:
+            cache_key = response_cache_key(
+                self.model,
+                messages,
+                offered.fingerprint,
+                getattr(self.llm, "temperature", None),
+            )
+            response = self.response_cache.get(cache_key)
+
+        async def chat() -> ChatResponse:
+            if self.stream:
+                return await self._stream_chat(
+                    messages, offered.tools, ctx, ev.session_id
+                )
+            return await self.llm.achat_with_tools(
                 model=self.model,
                 messages=messages,
-                tools=self.tools,
+                tools=offered.tools,
+                allow_parallel_tool_calls=self.allow_parallel_tool_calls,
             )
 
-        self.memory.put(response.message)
+        if response is None:
+            with using_prompt_template(template=self.system_prompt, version="v0.1"):
+                if self.rate_limiter is not None:
+                    response = await self.rate_limiter.call(
+                        self.model, chat, estimate_tokens(messages)
+                    )
+                else:
+                    response = await chat()
+            if self.response_cache is not None:
+                self.response_cache.put(cache_key, response)
+        elif (
+            self.stream
+            and ctx is not None
+            and response.message.content
+            and not response.message.additional_kwargs.get("tool_calls")
+        ):
+            ctx.write_event_to_stream(
+                TokenDeltaEvent(delta=response.message.content, session_id=ev.session_id)
+            )
+
+        memory = self.sessions.get(ev.session_id)
+        memory.put(response.message)
+        self._record_router_metrics(response, messages, memory)
 
         tool_calls = self.llm.get_tool_calls_from_response(
             response, error_on_no_tool_call=False
         )
+        if self.tool_selector is not None and tool_calls:
+            self.tool_selector.record_requests(
+                offered, [tool_call.tool_name for tool_call in tool_calls]
+            )
+        # Router iterations are counted per run in the workflow context.
+        if ctx is not None:
+            iterations = await ctx.get("router_iterations", default=0) + 1
+            await ctx.set("router_iterations", iterations)
         if tool_calls:
-            return ToolCallEvent(tool_calls=tool_calls)
+            return ToolCallEvent(tool_calls=tool_calls, session_id=ev.session_id)
         else:
+            if ctx is not None:
+                self.telemetry.record(
+                    "workflow.iterations", iterations, COUNT_BUCKETS
+                )
             return StopEvent(result=response.message.content)
 
-    @step
-    async def tool_call_handler(self, ev: ToolCallEvent) -> RouterInputEvent:
-        tool_calls = ev.tool_calls
+    def _record_router_metrics(
+        self, response: ChatResponse, messages: list[ChatMessage], memory: BaseMemory
+    ) -> None:
+        telemetry = self.telemetry
+        telemetry.increment("llm.calls", model=self.model)
+        usage = response_usage(response)
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if kind in usage:
+                telemetry.record(f"llm.{kind}", usage[kind], COUNT_BUCKETS, model=self.model)
+        telemetry.record("memory.messages", len(messages), COUNT_BUCKETS)
+        token_count = getattr(memory, "token_count", None)
+        if isinstance(token_count, int):
+            telemetry.record("memory.tokens", token_count, COUNT_BUCKETS)
+
+    async def _call_tool(
+        self, tool_call: ToolSelection, semaphore: asyncio.Semaphore
+    ) -> ChatMessage:
+        function_name = tool_call.tool_name
+        async with semaphore:
+            with self.telemetry.span(
+                f"skill {function_name}", "skill.duration", skill=function_name
+            ) as span:
+                try:
+                    function_callable = self.skill_map.get_function_callable_by_name(
+                        function_name
+                    )
+                    arguments = decode_tool_arguments(
+                        tool_call.tool_kwargs, self.max_argument_chars
+                    )
+                except KeyError:
+                    function_callable = None
+                    function_result = "Error: Unknown function call"
+                except ToolArgumentDecodeException as e:
+                    function_callable = None
+                    function_result = e.message
 
-        for tool_call in tool_calls:
-            function_name = tool_call.tool_name
-            arguments = tool_call.tool_kwargs
-            # TODO: Evaluate this for security and performance.
-            # TODO: Add try and except to catch errors and instruct the router to better construct the message
-            if "input" in arguments:
-                arguments = arguments.pop("input")
-                assert arguments[0] == "{"
-                assert arguments[-1] == "}"
-                arguments = {"input": eval(arguments)}
-            try:
-                function_callable = self.skill_map.get_function_callable_by_name(
-                    function_name
+                # Failures are isolated per call so sibling tool calls still complete.
+                if function_callable is not None:
+                    timeout = self.skill_map.get_timeout_by_name(function_name)
+                    if timeout is None:
+                        timeout = self.default_skill_timeout
+                    try:
+                        if inspect.iscoroutinefunction(function_callable):
+                            # Cancelled at the timeout, so the skill can clean up.
+                            function_result = await asyncio.wait_for(
+                                function_callable(arguments), timeout
+                            )
+                        else:
+                            function_result = await self.skill_executor.run(
+                                function_callable,
+                                arguments,
+                                self.skill_map.get_execution_policy_by_name(function_name),
+                                timeout=timeout,
+                            )
+                    except (asyncio.TimeoutError, SkillTimeoutException):
+                        function_result = f"Error: Skill timed out after {timeout} seconds"
+                        self.telemetry.increment("skill.timeouts", skill=function_name)
+                    except Exception as e:
+                        function_result = f"Error: {type(e).__name__}: {e}"
+
+                failed = isinstance(function_result, str) and function_result.startswith(
+                    TOOL_ERROR_PREFIXES
                 )
-                
-                if inspect.iscoroutinefunction(function_callable):
-                    function_result = await function_callable(arguments)
-                else:
-                    function_result = function_callable(arguments)
+                if failed:
+                    span.set_status(StatusCode.ERROR)
 
-            except KeyError:
-                function_result = "Error: Unknown function call"
+        self.telemetry.increment("skill.calls", skill=function_name)
+        if failed:
+            self.telemetry.increment("skill.errors", skill=function_name)
 
-            message = ChatMessage(
-                role="tool",
-                content=function_result,
-                additional_kwargs={"tool_call_id": tool_call.tool_id},
-            )
+        # Pages read back from the store are bounded by the LLM's requested length.
+        if (
+            self.result_store is not None
+            and isinstance(function_result, str)
+            and function_name != READ_TOOL_RESULT_SKILL_NAME
+        ):
+            function_result = self.result_store.spill(function_result)
+
+        return ChatMessage(
+            role="tool",
+            content=function_result,
+            additional_kwargs={"tool_call_id": tool_call.tool_id},
+        )
 
-            self.memory.put(message)
+    @step
+    @traced_step
+    async def tool_call_handler(self, ev: ToolCallEvent) -> RouterInputEvent:
+        tool_calls = ev.tool_calls
+        semaphore, dispatched = self._dispatched_tool_calls.pop(
+            ev.session_id, (asyncio.Semaphore(self.max_concurrent_tool_calls), {})
+        )
+
+        # Calls run concurrently, results are written to memory in the original order.
+        messages = await asyncio.gather(
+            *(
+                dispatched.get(tool_call.tool_id)
+                or self._call_tool(tool_call, semaphore)
+                for tool_call in tool_calls
+            )
+        )
+        memory = self.sessions.get(ev.session_id)
+        for message in messages:
+            memory.put(message)
 
-        return RouterInputEvent(input=self.memory.get())
+        return RouterInputEvent(input=memory.get(), session_id=ev.session_id)
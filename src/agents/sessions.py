@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Callable, Optional
+import threading
+import time
+
+from llama_index.core.memory import BaseMemory
+
+DEFAULT_SESSION_ID = "default"
+
+
+class SessionStore:
+    def __init__(
+        self,
+        memory_factory: Callable[[], BaseMemory],
+        max_sessions: int = 10000,
+        ttl: Optional[float] = 3600.0,
+    ):
+        """
+        Instantiates a SessionStore object.
+        This object holds one conversation memory per session id, so a single workflow
+        can serve many conversations. Sessions are evicted least recently used first once
+        max_sessions is exceeded, and after ttl seconds without being accessed.
+
+        Args:
+        - memory_factory: Callable[[], BaseMemory] - creates the memory for a new session
+        - max_sessions: int - maximum number of sessions held at once
+        - ttl: Optional[float] - seconds of inactivity before a session expires (None to disable)
+        """
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict[Hashable, tuple[BaseMemory, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Hashable) -> BaseMemory:
+        """
+        Returns the memory for a session, creating it if it doesn't exist or has expired.
+
+        Args:
+        - session_id: Hashable - id of the conversation
+
+        Returns:
+        - BaseMemory - the session's memory
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                memory = self.memory_factory()
+                self._sessions[session_id] = (memory, now)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                memory = entry[0]
+                self._sessions[session_id] = (memory, now)
+                self._sessions.move_to_end(session_id)
+            return memory
+
+    def pop(self, session_id: Hashable) -> Optional[BaseMemory]:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            return entry[0] if entry is not None else None
+
+    def _evict_expired(self, now: float) -> None:
+        if self.ttl is None:
+            return
+        # Entries are kept in access order, so expired sessions are always at the front.
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl:
+                break
+            del self._sessions[session_id]
+
+    def __contains__(self, session_id: Hashable) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
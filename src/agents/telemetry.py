@@ -0,0 +1,239 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, Sequence
+import functools
+import threading
+import time
+
+from opentelemetry import metrics, trace
+from opentelemetry.trace import Span
+
+INSTRUMENTATION_NAME = "multi-tool-agent"
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+# Upper bounds of count histograms (tokens, messages, iterations).
+COUNT_BUCKETS: tuple[float, ...] = (
+    1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072,
+)
+
+
+def metric_key(name: str, attributes: dict[str, Any]) -> str:
+    """Builds the registry key of a metric, e.g. "skill.duration{skill=multiply}"."""
+    if not attributes:
+        return name
+    labels = ",".join(f"{key}={attributes[key]}" for key in sorted(attributes))
+    return f"{name}{{{labels}}}"
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def record(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count,
+            # Cumulative counts per upper bound, like Prometheus "le" buckets.
+            "buckets": {
+                str(bound): sum(self.bucket_counts[: i + 1])
+                for i, bound in enumerate(self.buckets)
+            },
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Instantiates a MetricsRegistry object.
+        Low-overhead, in-process counters and histograms keyed by name and attributes,
+        readable at any time with snapshot() (e.g. from tests or a debug endpoint).
+        """
+        self._counters: dict[str, float] = dict()
+        self._histograms: dict[str, Histogram] = dict()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, **attributes: Any) -> None:
+        key = metric_key(name, attributes)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record(
+        self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **attributes: Any
+    ) -> None:
+        key = metric_key(name, attributes)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.record(value)
+
+    def counter(self, name: str, **attributes: Any) -> float:
+        return self._counters.get(metric_key(name, attributes), 0)
+
+    def histogram(self, name: str, **attributes: Any) -> Optional[dict[str, Any]]:
+        histogram = self._histograms.get(metric_key(name, attributes))
+        return histogram.snapshot() if histogram is not None else None
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {
+                    key: histogram.snapshot() for key, histogram in self._histograms.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+class Telemetry:
+    def __init__(
+        self,
+        tracer_provider: Optional[trace.TracerProvider] = None,
+        meter_provider: Optional[metrics.MeterProvider] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Instantiates a Telemetry object.
+        Records OpenTelemetry spans and metrics together with the in-process MetricsRegistry.
+        Without providers, the global OpenTelemetry providers are used (no-ops unless
+        configured, e.g. with configure_telemetry), so instrumentation costs little when
+        nothing is exported.
+
+        Args:
+        - tracer_provider: Optional[trace.TracerProvider] - provider of the tracer (None for the global one)
+        - meter_provider: Optional[metrics.MeterProvider] - provider of the meter (None for the global one)
+        - registry: Optional[MetricsRegistry] - in-process metrics (None for a new registry)
+        """
+        self.tracer_provider = tracer_provider
+        self.meter_provider = meter_provider
+        self.registry = registry or MetricsRegistry()
+        self.tracer = trace.get_tracer(INSTRUMENTATION_NAME, tracer_provider=tracer_provider)
+        self.meter = metrics.get_meter(INSTRUMENTATION_NAME, meter_provider=meter_provider)
+        self._instruments: dict[str, Any] = dict()
+        self._lock = threading.Lock()
+
+    def _instrument(self, name: str, kind: str) -> Any:
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            with self._lock:
+                instrument = self._instruments.get(name)
+                if instrument is None:
+                    unit = "s" if name.endswith(".duration") else "1"
+                    create = (
+                        self.meter.create_counter
+                        if kind == "counter"
+                        else self.meter.create_histogram
+                    )
+                    instrument = self._instruments[name] = create(name, unit=unit)
+        return instrument
+
+    def increment(self, name: str, amount: float = 1, **attributes: Any) -> None:
+        self.registry.increment(name, amount, **attributes)
+        self._instrument(name, "counter").add(amount, attributes)
+
+    def record(
+        self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **attributes: Any
+    ) -> None:
+        self.registry.record(name, value, buckets, **attributes)
+        self._instrument(name, "histogram").record(value, attributes)
+
+    @contextmanager
+    def span(self, name: str, metric: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Runs the block in a span and records its duration in the metric histogram.
+
+        Args:
+        - name: str - span name
+        - metric: str - duration histogram name
+        - attributes: Any - span and metric attributes
+        """
+        start = time.perf_counter()
+        try:
+            with self.tracer.start_as_current_span(name, attributes=attributes) as span:
+                yield span
+        finally:
+            self.record(metric, time.perf_counter() - start, **attributes)
+
+
+def traced_step(
+    function: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Wraps a workflow step method (placed under @step) in a "workflow.step" span and
+    records its latency in the workflow.step.duration histogram, using the workflow's
+    telemetry attribute.
+    """
+    step_name = function.__name__
+
+    @functools.wraps(function)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        with self.telemetry.span(
+            f"workflow.step {step_name}", "workflow.step.duration", step=step_name
+        ):
+            return await function(self, *args, **kwargs)
+
+    return wrapper
+
+
+def configure_telemetry(
+    span_exporter: Any = None,
+    metric_reader: Any = None,
+    service_name: str = INSTRUMENTATION_NAME,
+) -> Telemetry:
+    """
+    Builds a Telemetry exporting through the OpenTelemetry SDK.
+    By default spans and metrics are exported over OTLP/HTTP (configured with the standard
+    OTEL_EXPORTER_OTLP_* environment variables, needs the opentelemetry-exporter-otlp-proto-http
+    package). Tests can pass an InMemorySpanExporter and InMemoryMetricReader instead.
+
+    Args:
+    - span_exporter: Any - SpanExporter (None for OTLP)
+    - metric_reader: Any - MetricReader (None for a periodic OTLP reader)
+    - service_name: str - service.name resource attribute
+
+    Returns:
+    - Telemetry - pass it to AgentFlowOpenAI(telemetry=...)
+    """
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    if span_exporter is None or metric_reader is None:  # pragma: no cover
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+        span_exporter = span_exporter or OTLPSpanExporter()
+        metric_reader = metric_reader or PeriodicExportingMetricReader(OTLPMetricExporter())
+
+    resource = Resource.create({"service.name": service_name})
+    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+    return Telemetry(tracer_provider=tracer_provider, meter_provider=meter_provider)
+
+
+DEFAULT_TELEMETRY = Telemetry()
@@ -0,0 +1,218 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+import hashlib
+import math
+import re
+import threading
+
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.tools import FunctionTool
+
+from src.agents.tools import get_tool_registry
+from src.skills.base import SkillMap
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercases text and splits it into alphanumeric terms (snake_case names are split too)."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def skill_document(function_dict: Mapping[str, Any]) -> str:
+    """
+    Returns the text a skill is indexed by: its name, description and argument names and descriptions.
+
+    Args:
+    - function_dict: Mapping[str, Any] - the skill's OpenAI function dict
+
+    Returns:
+    - str - the document text
+    """
+    function = function_dict["function"]
+    parts = [function["name"], function["description"]]
+    for name, attrs in function["parameters"]["properties"].items():
+        parts.extend([name, attrs.get("description", "")])
+    return " ".join(parts)
+
+
+class BM25Index:
+    def __init__(self, documents: Mapping[str, str], k1: float = 1.5, b: float = 0.75):
+        """
+        Instantiates a BM25Index object, an in-process Okapi BM25 index.
+
+        Args:
+        - documents: Mapping[str, str] - document text by id, ids are returned in this order on ties
+        - k1: float - term frequency saturation
+        - b: float - document length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.ids = list(documents)
+        self._term_counts = [Counter(tokenize(text)) for text in documents.values()]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        document_frequency: Counter = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        n = len(self.ids)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        terms = [term for term in tokenize(query) if term in self._idf]
+        scores = []
+        for counts, length in zip(self._term_counts, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._average_length)
+            for term in terms:
+                tf = counts.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def top_k(self, query: str, k: int) -> list[str]:
+        """
+        Returns the ids of the (at most) k best matching documents, best first.
+        Documents that don't match the query are not returned.
+        """
+        ranked = sorted(
+            (
+                (-score, i)
+                for i, score in enumerate(self.scores(query))
+                if score > 0
+            )
+        )
+        return [self.ids[i] for _, i in ranked[:k]]
+
+
+def _tool_call_name(tool_call: Any) -> str:
+    # Tool calls in memory are ToolSelections, OpenAI tool call objects or their dicts.
+    if isinstance(tool_call, dict):
+        return tool_call.get("function", {}).get("name", "")
+    if hasattr(tool_call, "tool_name"):
+        return tool_call.tool_name
+    return getattr(getattr(tool_call, "function", None), "name", "")
+
+
+def used_tool_names(messages: Iterable[ChatMessage]) -> set[str]:
+    """Returns the names of the tools called by assistant messages in a chat history."""
+    return {
+        _tool_call_name(tool_call)
+        for message in messages
+        if message.role == MessageRole.ASSISTANT
+        for tool_call in message.additional_kwargs.get("tool_calls") or []
+    }
+
+
+def latest_user_query(messages: Sequence[ChatMessage]) -> str:
+    """Returns the content of the last user message in a chat history."""
+    for message in reversed(messages):
+        if message.role == MessageRole.USER:
+            return str(message.content or "")
+    return ""
+
+
+@dataclass(frozen=True)
+class ToolSubset:
+    """
+    Tools offered to the LLM for one router call.
+
+    Attributes:
+    - tools: tuple[FunctionTool, ...] - the offered tools, in SkillMap order
+    - fingerprint: str - hash of the offered tool schemas, for response cache keys
+    """
+
+    tools: tuple[FunctionTool, ...]
+    fingerprint: str
+
+    @property
+    def names(self) -> frozenset[str]:
+        return frozenset(tool.metadata.name for tool in self.tools)
+
+
+class ToolSelector:
+    def __init__(self, top_k: int = 8):
+        """
+        Instantiates a ToolSelector object.
+        Picks the top_k skills most relevant to the latest user message (BM25 over skill
+        names, descriptions and argument descriptions) so large SkillMaps don't send every
+        tool schema on every router call. Tools already called in the session are always
+        offered as well. The index is rebuilt when the SkillMap version changes.
+
+        Args:
+        - top_k: int - number of retrieved tools offered per router call
+        """
+        self.top_k = top_k
+        self.selections = 0
+        self.tools_offered = 0
+        self.requests = 0
+        self.unoffered_requests = 0
+        self._index: BM25Index = BM25Index({})
+        self._index_key: tuple[int, int] = (-1, -1)
+        self._lock = threading.Lock()
+
+    def _get_index(self, skill_map: SkillMap) -> BM25Index:
+        key = (id(skill_map), skill_map.version)
+        with self._lock:
+            if self._index_key != key:
+                self._index = BM25Index(
+                    {
+                        name: skill_document(function_attr["function_dict"])
+                        for name, function_attr in skill_map.skill_map.items()
+                    }
+                )
+                self._index_key = key
+            return self._index
+
+    def select(self, skill_map: SkillMap, messages: Sequence[ChatMessage]) -> ToolSubset:
+        """
+        Returns the tools to offer for a chat history.
+
+        Args:
+        - skill_map: SkillMap - all available skills
+        - messages: Sequence[ChatMessage] - the chat history sent to the LLM
+
+        Returns:
+        - ToolSubset - the offered tools
+        """
+        registry = get_tool_registry(skill_map)
+        if len(registry.tools) <= self.top_k:
+            subset = ToolSubset(tools=registry.tools, fingerprint=registry.fingerprint)
+        else:
+            index = self._get_index(skill_map)
+            ranked = index.top_k(latest_user_query(messages), self.top_k)
+            # Fill up with unmatched tools in SkillMap order, so the LLM is never left without tools.
+            ranked.extend(
+                [name for name in index.ids if name not in ranked][: self.top_k - len(ranked)]
+            )
+            names = set(ranked) | used_tool_names(messages)
+            tools = tuple(tool for tool in registry.tools if tool.metadata.name in names)
+            key = ",".join([registry.fingerprint, *(tool.metadata.name for tool in tools)])
+            subset = ToolSubset(
+                tools=tools, fingerprint=hashlib.sha256(key.encode("utf-8")).hexdigest()
+            )
+        with self._lock:
+            self.selections += 1
+            self.tools_offered += len(subset.tools)
+        return subset
+
+    def record_requests(self, subset: ToolSubset, tool_names: Iterable[str]) -> None:
+        """Counts the tools the LLM called, and how many of them weren't offered."""
+        tool_names = list(tool_names)
+        offered = subset.names
+        with self._lock:
+            self.requests += len(tool_names)
+            self.unoffered_requests += sum(name not in offered for name in tool_names)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "selections": self.selections,
+            "tools_offered": self.tools_offered,
+            "requests": self.requests,
+            "unoffered_requests": self.unoffered_requests,
+        }
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Mapping
+from weakref import WeakKeyDictionary
+import threading
+
+from llama_index.core.tools import FunctionTool, ToolMetadata
+
+from src.skills.base import SkillMap
+
+
+@dataclass(frozen=True)
+class ToolRegistry:
+    """
+    Immutable set of LlamaIndex tools compiled from a SkillMap.
+
+    Attributes:
+    - tools: tuple[FunctionTool, ...] - tools in SkillMap order, as passed to the LLM
+    - tools_by_name: Mapping[str, FunctionTool] - read-only lookup of tools by skill name
+    - version: int - the SkillMap version the registry was compiled from
+    - fingerprint: str - sha256 of the tool schemas, changes whenever what the LLM sees changes
+    """
+
+    tools: tuple[FunctionTool, ...]
+    tools_by_name: Mapping[str, FunctionTool]
+    version: int
+    fingerprint: str
+
+    @classmethod
+    def from_skill_map(cls, skill_map: SkillMap) -> "ToolRegistry":
+        tools = tuple(
+            FunctionTool(
+                skill_map.get_function_callable_by_name(func),
+                metadata=ToolMetadata(
+                    name=func,
+                    description=skill_map.get_function_dict_by_name(func),
+                ),
+            )
+            for func in skill_map.get_function_list()
+        )
+        schemas = json.dumps(
+            [tool.metadata.to_openai_tool() for tool in tools],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return cls(
+            tools=tools,
+            tools_by_name=MappingProxyType(
+                {tool.metadata.name: tool for tool in tools}
+            ),
+            version=skill_map.version,
+            fingerprint=hashlib.sha256(schemas.encode("utf-8")).hexdigest(),
+        )
+
+
+_REGISTRY_CACHE: "WeakKeyDictionary[SkillMap, ToolRegistry]" = WeakKeyDictionary()
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_tool_registry(skill_map: SkillMap) -> ToolRegistry:
+    """
+    Returns the ToolRegistry for a SkillMap, compiling it on first use.
+    The registry is cached per SkillMap and only rebuilt when a skill is added or removed.
+
+    Args:
+    - skill_map: SkillMap - the skills to expose to the LLM
+
+    Returns:
+    - ToolRegistry - the shared, immutable tool registry
+    """
+    registry = _REGISTRY_CACHE.get(skill_map)
+    if registry is not None and registry.version == skill_map.version:
+        return registry
+    with _REGISTRY_LOCK:
+        registry = _REGISTRY_CACHE.get(skill_map)
+        if registry is None or registry.version != skill_map.version:
+            registry = ToolRegistry.from_skill_map(skill_map)
+            _REGISTRY_CACHE[skill_map] = registry
+        return registry
@@ -1,10 +1,12 @@
-import typing
 from typing import Any, Callable, Union, Optional
-import inspect
 from pydantic import BaseModel, model_validator, field_validator
 from abc import ABC, abstractmethod
 
-from src.skills.errors import SkillArgException
+from src.skills.errors import SkillArgException, SkillInputException
+from src.skills.cache import ResultCache, canonical_key
+from src.skills.execution import ExecutionPolicy
+from src.skills.schema import compile_skill_schema
+from src.skills.validation import ArgValidator, compile_dtype
 
 
 class SkillArgAttr(BaseModel):
@@ -25,23 +27,7 @@ class SkillArgAttr(BaseModel):
 
     @field_validator("dtype")
     def dtype_validation(cls, v: str) -> Any:
-        try:
-            eval_type = eval(
-                v, {"__builtins__": __builtins__}, {"typing": typing, **vars(typing)}
-            )
-            if not any(
-                [
-                    inspect.getmodule(eval_type) is typing,
-                    isinstance(eval_type, type),
-                ]
-            ):
-                raise SkillArgException(
-                    f'dtype {v} is not a valid type (e.g. "Union[str, int]")'
-                )
-        except Exception as e:
-            raise SkillArgException(
-                f'dtype {v} is not a valid type (e.g. "Union[str, int]"): {e}'
-            )
+        compile_dtype(v)
         return v
 
     @model_validator(mode="before")
@@ -59,12 +45,7 @@ class SkillArgAttr(BaseModel):
         dtype = values.dtype
         default = values.default
         if default is not None:
-            eval_type = eval(
-                dtype,
-                {"__builtins__": __builtins__},
-                {"typing": typing, **vars(typing)},
-            )
-            if not isinstance(default, eval_type):
+            if not compile_dtype(dtype)(default):
                 raise SkillArgException(
                     f"default value {default} is not of type {dtype}"
                 )
@@ -77,6 +58,11 @@ class FunctionCallSkill(ABC):
         name: str,
         description: str,
         function_args: Optional[list[SkillArgAttr]] = [],
+        execution_policy: ExecutionPolicy = ExecutionPolicy.INLINE,
+        cache_results: bool = False,
+        cache_max_size: int = 1024,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
     ):
         """
         Instantiates a FunctionCallSkill object.
@@ -86,40 +72,30 @@ class FunctionCallSkill(ABC):
         - name: str - name of the function
         - description: str - description of the function
         - function_args: Optional[list[SkillArgAttr]] - list of SkillArgAttr objects that define the arguments of the function
+        - execution_policy: ExecutionPolicy - where a synchronous execute runs: inline, thread pool or process pool (ignored by async skills)
+        - cache_results: bool - memoize results by validated arguments (only for pure/deterministic skills)
+        - cache_max_size: int - maximum number of memoized results
+        - cache_ttl: Optional[float] - seconds a memoized result stays valid (None to disable)
+        - timeout: Optional[float] - seconds a call may take before the router gives up on it (None for no limit, not enforced for INLINE sync skills)
         """
         self.name = name
         self.description = description
         self.function_args = function_args
+        self.argument_validator = ArgValidator(function_args)
+        self.execution_policy = ExecutionPolicy(execution_policy)
+        self.timeout = timeout
+        self.result_cache: Optional[ResultCache] = (
+            ResultCache(max_size=cache_max_size, ttl=cache_ttl)
+            if cache_results
+            else None
+        )
         self.function_callable = self.handle_router_input
+        # Compiled once: JSON Schema arguments, canonical serialization and content hash.
+        self.schema = compile_skill_schema(name, description, function_args)
         self.function_dict = self._prepare_function_dict()
 
     def _prepare_function_dict(self) -> dict[str, dict[str, Union[str, dict]]]:
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        arg.name: {
-                            "type": arg.dtype,
-                            "description": arg.description,
-                        }
-                        if arg.required
-                        else {
-                            "type": arg.dtype,
-                            "description": arg.description,
-                            "default": arg.default,
-                        }
-                        for arg in self.function_args
-                    },
-                    "required": [
-                        arg.name for arg in self.function_args if arg.required
-                    ],
-                },
-            },
-        }
+        return self.schema.function_dict
 
     def get_function_name(self) -> str:
         return self.name
@@ -130,6 +106,15 @@ class FunctionCallSkill(ABC):
     def get_function_callable(self) -> Callable:
         return self.function_callable
 
+    def get_schema_hash(self) -> str:
+        return self.schema.content_hash
+
+    def get_execution_policy(self) -> ExecutionPolicy:
+        return self.execution_policy
+
+    def get_timeout(self) -> Optional[float]:
+        return self.timeout
+
     def handle_router_input(self, args: dict[str, Any]) -> str:
         """
         This method is used to handle the input from the LLM router agent.
@@ -141,27 +126,16 @@ class FunctionCallSkill(ABC):
         Returns:
         - str - result of the execute method
         """
-        if len(self.function_args) == 0:
-            return self.execute()
-
-        if isinstance(args, dict) and "input" in args:
-            input_args = args["input"]
-        else:
-            return 'Invalid input: expected a dictionary with the key "input" that\'s value is a dictionary.'
-
-        parsed_args: dict[str, Any] = dict()
-
-        for arg in self.function_args:
-            if arg.name in input_args:
-                if not isinstance(input_args[arg.name], eval(arg.dtype)):
-                    return f'Invalid input: argument "{arg.name}" must be of type {arg.dtype}'
-                parsed_args[arg.name] = input_args[arg.name]
-            elif arg.required and not arg.default:
-                return f'Invalid input: missing required argument "{arg.name}"'
-            else:
-                parsed_args[arg.name] = arg.default
-        
-        return self.execute(**parsed_args)
+        try:
+            parsed_args = self.argument_validator.validate(args)
+        except SkillInputException as e:
+            return e.message
+
+        if self.result_cache is None:
+            return self.execute(**parsed_args)
+        return self.result_cache.call(
+            canonical_key(parsed_args), lambda: self.execute(**parsed_args)
+        )
 
     @abstractmethod
     def execute(self) -> str:
@@ -184,27 +158,16 @@ class FunctionCallSkillAsync(FunctionCallSkill, ABC):
         Returns:
         - str - result of the execute method
         """
-        if len(self.function_args) == 0:
-            return await self.execute()
-
-        if isinstance(args, dict) and "input" in args:
-            input_args = args["input"]
-        else:
-            return 'Invalid input: expected a dictionary with the key "input" that\'s value is a dictionary.'
-
-        parsed_args: dict[str, Any] = dict()
-
-        for arg in self.function_args:
-            if arg.name in input_args:
-                if not isinstance(input_args[arg.name], eval(arg.dtype)):
-                    return f'Invalid input: argument "{arg.name}" must be of type {arg.dtype}'
-                parsed_args[arg.name] = input_args[arg.name]
-            elif arg.required and not arg.default:
-                return f'Invalid input: missing required argument "{arg.name}"'
-            else:
-                parsed_args[arg.name] = arg.default
-        
-        return await self.execute(**parsed_args)
+        try:
+            parsed_args = self.argument_validator.validate(args)
+        except SkillInputException as e:
+            return e.message
+
+        if self.result_cache is None:
+            return await self.execute(**parsed_args)
+        return await self.result_cache.acall(
+            canonical_key(parsed_args), lambda: self.execute(**parsed_args)
+        )
 
     @abstractmethod
     async def execute(self) -> str:
@@ -224,17 +187,55 @@ class SkillMap:
         - skills: list[FunctionCallSkill] - list of FunctionCallSkill objects
         """
         self.skill_map: dict[
-            str, dict[str, Union[Callable, dict[str, dict[str, Union[str, dict]]]]]
+            str,
+            dict[
+                str,
+                Union[
+                    Callable, ExecutionPolicy, dict[str, dict[str, Union[str, dict]]]
+                ],
+            ],
         ] = dict()
+        self.version = 0
         for skill in skills:
-            self.skill_map[skill.get_function_name()] = {
-                "function_dict": skill.get_function_dict(),
-                "function_callable": skill.get_function_callable(),
-            }
+            self.add_skill(skill)
+
+    def add_skill(self, skill: FunctionCallSkill) -> None:
+        """
+        Adds (or replaces) a skill, bumping the SkillMap version so that
+        anything compiled from the skill set is rebuilt.
+
+        Args:
+        - skill: FunctionCallSkill - the skill to add
+        """
+        self.skill_map[skill.get_function_name()] = {
+            "function_dict": skill.get_function_dict(),
+            "function_description": skill.schema.serialized.decode("utf-8"),
+            "schema_hash": skill.get_schema_hash(),
+            "function_callable": skill.get_function_callable(),
+            "execution_policy": skill.get_execution_policy(),
+            "timeout": skill.get_timeout(),
+        }
+        self.version += 1
+
+    def remove_skill(self, skill_name: str) -> None:
+        """
+        Removes a skill, bumping the SkillMap version.
+
+        Args:
+        - skill_name: str - name of the skill to remove
+        """
+        del self.skill_map[skill_name]
+        self.version += 1
 
     def get_function_callable_by_name(self, skill_name: str) -> Callable:
         return self.skill_map[skill_name]["function_callable"]
 
+    def get_execution_policy_by_name(self, skill_name: str) -> ExecutionPolicy:
+        return self.skill_map[skill_name]["execution_policy"]
+
+    def get_timeout_by_name(self, skill_name: str) -> Optional[float]:
+        return self.skill_map[skill_name]["timeout"]
+
     def get_combined_function_description_for_agent(self) -> list[dict]:
         combined_dict: list[dict] = []
         for _, function_attr in self.skill_map.items():
@@ -248,6 +249,7 @@ class SkillMap:
         return [skill["function_callable"] for skill in self.skill_map.values()]
 
     def get_function_dict_by_name(self, skill_name: str) -> str:
-        return str(
-            self.skill_map[skill_name]["function_dict"]["function"]
-        )
+        return self.skill_map[skill_name]["function_description"]
+
+    def get_schema_hash_by_name(self, skill_name: str) -> str:
+        return self.skill_map[skill_name]["schema_hash"]
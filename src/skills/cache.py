@@ -0,0 +1,164 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import json
+import threading
+import time
+
+
+def canonical_key(parsed_args: dict[str, Any]) -> str:
+    """
+    Builds a canonical cache key from validated skill arguments.
+    Keys are sorted so that argument order from the LLM doesn't matter.
+
+    Args:
+    - parsed_args: dict[str, Any] - validated keyword arguments for the execute method
+
+    Returns:
+    - str - canonical key
+    """
+    return json.dumps(
+        parsed_args, sort_keys=True, separators=(",", ":"), default=repr
+    )
+
+
+class ResultCache:
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        Instantiates a ResultCache object.
+        Results are evicted least recently used first once max_size is exceeded, and
+        ttl seconds after they were stored. Concurrent calls for a key that is already
+        being computed wait for that computation instead of running it again.
+
+        Args:
+        - max_size: int - maximum number of results held
+        - ttl: Optional[float] - seconds a result stays valid (None to disable)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._results: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[str, Future] = dict()
+        self._inflight_async: dict[str, asyncio.Future] = dict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+        result, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+            del self._results[key]
+            return False, None
+        self._results.move_to_end(key)
+        return True, result
+
+    def _store(self, key: str, result: Any) -> None:
+        self._results[key] = (result, time.monotonic())
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def call(self, key: str, function: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result for key, or computes it with function.
+
+        Args:
+        - key: str - canonical key of the call
+        - function: Callable[[], Any] - computes the result on a miss
+
+        Returns:
+        - Any - the (possibly cached) result
+        """
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                self.hits += 1
+                return result
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, result)
+            del self._inflight[key]
+        future.set_result(result)
+        return result
+
+    async def acall(self, key: str, function: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of call, for coroutine functions.
+
+        Args:
+        - key: str - canonical key of the call
+        - function: Callable[[], Awaitable[Any]] - computes the result on a miss
+
+        Returns:
+        - Any - the (possibly cached) result
+        """
+        with self._lock:
+            found, result = self._lookup(key)
+            if found:
+                self.hits += 1
+                return result
+        future = self._inflight_async.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = future
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            del self._inflight_async[key]
+            future.cancel()
+            raise
+        except BaseException as e:
+            del self._inflight_async[key]
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other caller was waiting.
+            future.exception()
+            raise
+        with self._lock:
+            self._store(key, result)
+        del self._inflight_async[key]
+        future.set_result(result)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._results),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Locks and futures can't be pickled, a copy starts with an empty cache.
+        return {"max_size": self.max_size, "ttl": self.ttl}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)
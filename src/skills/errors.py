@@ -1,4 +1,21 @@
 class SkillArgException(Exception):
     def __init__(self, message):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class SkillInputException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SkillExecutionException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SkillTimeoutException(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
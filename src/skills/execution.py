@@ -0,0 +1,147 @@
+from typing import Any, Callable, Optional
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+import asyncio
+import pickle
+import threading
+
+from src.skills.errors import SkillExecutionException, SkillTimeoutException
+
+
+class ExecutionPolicy(str, Enum):
+    """
+    How a synchronous skill is executed by the router agent.
+
+    Attributes:
+    - INLINE: run directly on the event loop thread (only for fast, non-blocking skills)
+    - THREAD: run in the shared thread pool (blocking I/O)
+    - PROCESS: run in the shared process pool (CPU heavy work, skill must be picklable)
+    """
+
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def _invoke_pickled(payload: bytes) -> Any:
+    function_callable, arguments = pickle.loads(payload)
+    return function_callable(arguments)
+
+
+class SkillExecutor:
+    def __init__(
+        self,
+        max_thread_workers: Optional[int] = None,
+        max_process_workers: Optional[int] = None,
+    ):
+        """
+        Instantiates a SkillExecutor object.
+        This object owns the thread and process pools that synchronous skills are offloaded to.
+        Pools are created lazily on first use.
+
+        Args:
+        - max_thread_workers: Optional[int] - size of the thread pool (defaults to the ThreadPoolExecutor default)
+        - max_process_workers: Optional[int] - size of the process pool (defaults to the number of CPUs)
+        """
+        self.max_thread_workers = max_thread_workers
+        self.max_process_workers = max_process_workers
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Timed out calls that are still occupying a pool worker, by policy.
+        self._abandoned: dict[ExecutionPolicy, int] = {
+            ExecutionPolicy.THREAD: 0,
+            ExecutionPolicy.PROCESS: 0,
+        }
+
+    def get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.max_thread_workers,
+                    thread_name_prefix="skill",
+                )
+            return self._thread_pool
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_process_workers
+                )
+            return self._process_pool
+
+    def abandoned(self, policy: ExecutionPolicy) -> int:
+        """Number of timed out calls still running in the policy's pool, each holding a worker."""
+        return self._abandoned[policy]
+
+    def _release(self, policy: ExecutionPolicy) -> None:
+        with self._lock:
+            self._abandoned[policy] -= 1
+
+    async def _wait(
+        self, future: Future, policy: ExecutionPolicy, timeout: Optional[float]
+    ) -> str:
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # A call that hasn't started is dropped from the queue. A running one can't be
+            # interrupted: it is abandoned and counted until its worker is free again.
+            if not future.cancel():
+                with self._lock:
+                    self._abandoned[policy] += 1
+                future.add_done_callback(lambda _: self._release(policy))
+            raise SkillTimeoutException(f"Skill timed out after {timeout} seconds")
+
+    async def run(
+        self,
+        function_callable: Callable[[dict[str, Any]], str],
+        arguments: dict[str, Any],
+        policy: ExecutionPolicy = ExecutionPolicy.INLINE,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Runs a synchronous skill callable according to its execution policy.
+
+        Args:
+        - function_callable: Callable - the skill's router input handler
+        - arguments: dict[str, Any] - input from the LLM router agent
+        - policy: ExecutionPolicy - where to run the callable
+        - timeout: Optional[float] - seconds to wait for a THREAD or PROCESS call (INLINE calls can't be interrupted)
+
+        Returns:
+        - str - result of the skill
+
+        Raises:
+        - SkillExecutionException - if the skill or its arguments cannot be sent to the process pool
+        - SkillTimeoutException - if the call didn't finish within timeout
+        """
+        if policy is ExecutionPolicy.INLINE:
+            return function_callable(arguments)
+
+        if policy is ExecutionPolicy.THREAD:
+            future = self.get_thread_pool().submit(function_callable, arguments)
+            return await self._wait(future, policy, timeout)
+
+        # Serialise up front so unpicklable skills fail here with a clear message,
+        # rather than inside the pool's feeder thread.
+        try:
+            payload = pickle.dumps((function_callable, arguments))
+        except Exception as e:
+            raise SkillExecutionException(
+                f"Skill cannot be executed in a process pool, it or its arguments are not picklable: {e}"
+            )
+        future = self.get_process_pool().submit(_invoke_pickled, payload)
+        return await self._wait(future, policy, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=wait)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=wait)
+                self._process_pool = None
+
+
+DEFAULT_SKILL_EXECUTOR = SkillExecutor()
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from src.skills.base import FunctionCallSkill, SkillArgAttr
+
+READ_TOOL_RESULT_SKILL_NAME = "read_tool_result"
+
+
+class ResultStore:
+    def __init__(
+        self,
+        spill_threshold_chars: int = 8000,
+        excerpt_chars: int = 1000,
+        directory: Optional[str] = None,
+        max_results: int = 1000,
+    ):
+        """
+        Instantiates a ResultStore object.
+        Tool results longer than spill_threshold_chars are written to a spill directory
+        instead of the transcript; the transcript gets a size-bounded excerpt plus a handle
+        that the read_tool_result skill (ReadToolResult) can page through.
+
+        Args:
+        - spill_threshold_chars: int - results longer than this are spilled
+        - excerpt_chars: int - characters of a spilled result kept in the transcript
+        - directory: Optional[str] - spill directory (defaults to a new temporary directory)
+        - max_results: int - spilled results kept on disk, least recently used are deleted first
+        """
+        self.spill_threshold_chars = spill_threshold_chars
+        self.excerpt_chars = excerpt_chars
+        self.max_results = max_results
+        self._owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="tool-results-")
+        os.makedirs(self.directory, exist_ok=True)
+        self._handles: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.txt")
+
+    def store(self, content: str) -> str:
+        """
+        Writes a result to the spill directory.
+
+        Args:
+        - content: str - the full result
+
+        Returns:
+        - str - handle of the stored result (content addressed, identical results share one file)
+        """
+        handle = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            if handle not in self._handles:
+                with open(self._path(handle), "w", encoding="utf-8") as f:
+                    f.write(content)
+            self._handles[handle] = len(content)
+            self._handles.move_to_end(handle)
+            while len(self._handles) > self.max_results:
+                evicted, _ = self._handles.popitem(last=False)
+                os.remove(self._path(evicted))
+        return handle
+
+    def read(self, handle: str, offset: int = 0, length: int = 4000) -> str:
+        """
+        Reads part of a stored result.
+
+        Args:
+        - handle: str - handle returned by store
+        - offset: int - first character to read
+        - length: int - number of characters to read
+
+        Returns:
+        - str - the requested characters, or an error message for unknown handles
+        """
+        with self._lock:
+            size = self._handles.get(handle)
+            if size is None:
+                return f'Error: unknown result handle "{handle}"'
+            self._handles.move_to_end(handle)
+        offset = max(offset, 0)
+        with open(self._path(handle), "r", encoding="utf-8") as f:
+            f.read(offset)
+            chunk = f.read(max(length, 0))
+        end = offset + len(chunk)
+        return f"[Characters {offset}-{end} of {size}]\n{chunk}"
+
+    def spill(self, content: str) -> str:
+        """
+        Returns content unchanged if it is small enough, otherwise stores it and
+        returns an excerpt with its handle for the transcript.
+
+        Args:
+        - content: str - tool result
+
+        Returns:
+        - str - what to put in the transcript
+        """
+        if len(content) <= self.spill_threshold_chars:
+            return content
+        handle = self.store(content)
+        return (
+            f'[Result too large for the conversation ({len(content)} characters), stored with handle "{handle}". '
+            f"The first {self.excerpt_chars} characters are below. "
+            f"Use the {READ_TOOL_RESULT_SKILL_NAME} skill with this handle, an offset and a length to read more.]\n"
+            f"{content[: self.excerpt_chars]}"
+        )
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_directory:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            else:
+                for handle in self._handles:
+                    os.remove(self._path(handle))
+            self._handles.clear()
+
+
+class ReadToolResult(FunctionCallSkill):
+    def __init__(self, result_store: ResultStore):
+        """
+        Instantiates a ReadToolResult skill, letting the LLM page through tool results
+        that a ResultStore moved out of the conversation.
+
+        Args:
+        - result_store: ResultStore - the store used by the router agent
+        """
+        self.result_store = result_store
+        super().__init__(
+            name=READ_TOOL_RESULT_SKILL_NAME,
+            description="Read part of a large tool result that was stored out of the conversation, by its handle",
+            function_args=[
+                SkillArgAttr(
+                    name="handle",
+                    description="Handle of the stored result",
+                    dtype="str",
+                    required=True,
+                ),
+                SkillArgAttr(
+                    name="offset",
+                    description="First character to read",
+                    dtype="int",
+                    default=0,
+                ),
+                SkillArgAttr(
+                    name="length",
+                    description="Number of characters to read",
+                    dtype="int",
+                    default=4000,
+                ),
+            ],
+        )
+
+    def execute(self, handle: str, offset: int = 0, length: int = 4000) -> str:
+        return self.result_store.read(handle, offset, length)
@@ -0,0 +1,191 @@
+import typing
+from typing import Any, Union
+from functools import lru_cache
+from collections.abc import Iterable, Mapping, Set
+from dataclasses import dataclass
+import copy
+import hashlib
+import json
+import types
+
+from src.skills.validation import resolve_dtype
+
+if typing.TYPE_CHECKING:
+    from src.skills.base import SkillArgAttr
+
+JSON_TYPES: dict[type, str] = {
+    str: "string",
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    type(None): "null",
+    list: "array",
+    tuple: "array",
+    set: "array",
+    frozenset: "array",
+    dict: "object",
+}
+
+
+def _schema_for(tp: Any) -> dict[str, Any]:
+    if tp is Any:
+        return {}
+    origin = typing.get_origin(tp)
+    params = typing.get_args(tp)
+
+    if origin is None:
+        if tp in JSON_TYPES:
+            return {"type": JSON_TYPES[tp]}
+        if isinstance(tp, type) and issubclass(tp, Mapping):
+            return {"type": "object"}
+        if isinstance(tp, type) and issubclass(tp, Iterable) and not issubclass(tp, (str, bytes)):
+            return {"type": "array"}
+        # No JSON equivalent (e.g. bytes or custom classes), leave it unconstrained.
+        return {}
+
+    if origin is Union or origin is types.UnionType:
+        members = [_schema_for(p) for p in params]
+        # Unions of plain types collapse to a type list, e.g. {"type": ["string", "null"]}.
+        if all(list(member) == ["type"] for member in members):
+            type_names: list[str] = []
+            for member in members:
+                if member["type"] not in type_names:
+                    type_names.append(member["type"])
+            return {"type": type_names}
+        if {} in members:
+            return {}
+        return {"anyOf": members}
+
+    if origin is typing.Literal:
+        schema: dict[str, Any] = {"enum": list(params)}
+        literal_types = {JSON_TYPES.get(type(p)) for p in params}
+        if len(literal_types) == 1 and None not in literal_types:
+            schema["type"] = literal_types.pop()
+        return schema
+
+    if not isinstance(origin, type):
+        return {}
+
+    if not params:
+        return _schema_for(origin)
+
+    if issubclass(origin, tuple):
+        if len(params) == 2 and params[1] is Ellipsis:
+            return _array_schema(_schema_for(params[0]))
+        return {
+            "type": "array",
+            "prefixItems": [_schema_for(p) for p in params],
+            "minItems": len(params),
+            "maxItems": len(params),
+        }
+
+    if issubclass(origin, Mapping):
+        schema = {"type": "object"}
+        value_schema = _schema_for(params[1]) if len(params) > 1 else {}
+        if value_schema:
+            schema["additionalProperties"] = value_schema
+        return schema
+
+    if issubclass(origin, Iterable) and not issubclass(origin, (str, bytes)):
+        schema = _array_schema(_schema_for(params[0]))
+        if issubclass(origin, Set):
+            schema["uniqueItems"] = True
+        return schema
+
+    return _schema_for(origin)
+
+
+def _array_schema(items: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "array", "items": items} if items else {"type": "array"}
+
+
+@lru_cache(maxsize=None)
+def _cached_dtype_schema(dtype: str) -> dict[str, Any]:
+    return _schema_for(resolve_dtype(dtype))
+
+
+def dtype_to_json_schema(dtype: str) -> dict[str, Any]:
+    """
+    Compiles a dtype string into a minimal JSON Schema.
+    e.g. "Union[int, float]" -> {"type": ["integer", "number"]},
+    "list[str]" -> {"type": "array", "items": {"type": "string"}}.
+    Types without a JSON equivalent are left unconstrained ({}).
+
+    Args:
+    - dtype: str - data type of the argument (typing or python type)
+
+    Returns:
+    - dict[str, Any] - the JSON Schema (a new copy, safe to modify)
+    """
+    return copy.deepcopy(_cached_dtype_schema(dtype))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def canonical_json(value: Any) -> bytes:
+    """Serializes a value to compact JSON with sorted keys, so equal schemas give equal bytes."""
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class SkillSchema:
+    """
+    Compiled tool definition of a skill.
+
+    Attributes:
+    - function_dict: dict - OpenAI tool definition ({"type": "function", "function": {...}})
+    - serialized: bytes - canonical JSON of function_dict["function"]
+    - content_hash: str - sha256 of serialized, changes whenever the definition changes
+    """
+
+    function_dict: dict[str, Any]
+    serialized: bytes
+    content_hash: str
+
+
+def compile_skill_schema(
+    name: str, description: str, function_args: list["SkillArgAttr"]
+) -> SkillSchema:
+    """
+    Compiles a skill's name, description and SkillArgAttrs into its tool definition.
+
+    Args:
+    - name: str - name of the function
+    - description: str - description of the function
+    - function_args: list[SkillArgAttr] - the function's arguments
+
+    Returns:
+    - SkillSchema - the tool definition with its canonical serialization and hash
+    """
+    properties: dict[str, Any] = dict()
+    for arg in function_args:
+        prop = dtype_to_json_schema(arg.dtype)
+        prop["description"] = arg.description
+        if not arg.required and arg.default is not None:
+            prop["default"] = arg.default
+        properties[arg.name] = prop
+    function = {
+        "name": name,
+        "description": description,
+        "parameters": {
+            "type": "object",
+            "properties": properties,
+            "required": [arg.name for arg in function_args if arg.required],
+        },
+    }
+    serialized = canonical_json(function)
+    return SkillSchema(
+        function_dict={"type": "function", "function": function},
+        serialized=serialized,
+        content_hash=hashlib.sha256(serialized).hexdigest(),
+    )
@@ -0,0 +1,190 @@
+import typing
+from typing import Any, Callable, Union
+from functools import lru_cache
+from collections.abc import Iterable, Mapping
+import inspect
+import types
+
+from src.skills.errors import SkillArgException, SkillInputException
+
+if typing.TYPE_CHECKING:
+    from src.skills.base import SkillArgAttr
+
+DTYPE_NAMESPACE: dict[str, Any] = {"typing": typing, **vars(typing)}
+
+TypeChecker = Callable[[Any], bool]
+
+
+@lru_cache(maxsize=None)
+def resolve_dtype(dtype: str) -> Any:
+    """
+    Resolves a dtype string (e.g. "Union[int, float]") into a type object.
+    Results are cached so that each distinct dtype string is only evaluated once.
+
+    Args:
+    - dtype: str - data type of the argument (typing or python type)
+
+    Returns:
+    - Any - the resolved type object
+    """
+    try:
+        eval_type = eval(dtype, {"__builtins__": __builtins__}, DTYPE_NAMESPACE)
+    except Exception as e:
+        raise SkillArgException(
+            f'dtype {dtype} is not a valid type (e.g. "Union[str, int]"): {e}'
+        )
+    if not any(
+        [
+            inspect.getmodule(eval_type) is typing,
+            isinstance(eval_type, (type, types.GenericAlias, types.UnionType)),
+        ]
+    ):
+        raise SkillArgException(
+            f'dtype {dtype} is not a valid type (e.g. "Union[str, int]")'
+        )
+    return eval_type
+
+
+@lru_cache(maxsize=None)
+def compile_dtype(dtype: str) -> TypeChecker:
+    """
+    Compiles a dtype string into a type checker callable.
+    The checker returns True if a value matches the dtype. Container generics
+    (e.g. "list[int]", "dict[str, float]", "Optional[list[str]]") are checked element-wise.
+
+    Args:
+    - dtype: str - data type of the argument (typing or python type)
+
+    Returns:
+    - TypeChecker - callable taking a value and returning a bool
+    """
+    return _build_checker(resolve_dtype(dtype))
+
+
+def _always(value: Any) -> bool:
+    return True
+
+
+def _build_checker(tp: Any) -> TypeChecker:
+    if tp is Any:
+        return _always
+    origin = typing.get_origin(tp)
+    params = typing.get_args(tp)
+
+    if origin is None:
+        if isinstance(tp, type):
+            return lambda value: isinstance(value, tp)
+        raise SkillArgException(f"unsupported dtype {tp}")
+
+    if origin is Union or origin is types.UnionType:
+        members = [type(None) if p is None else p for p in params]
+        if all(isinstance(p, type) and not typing.get_args(p) for p in members):
+            plain = tuple(members)
+            return lambda value: isinstance(value, plain)
+        checkers = tuple(_build_checker(p) for p in members)
+        return lambda value: any(check(value) for check in checkers)
+
+    if origin is typing.Literal:
+        literals = params
+        return lambda value: any(
+            value == literal and type(value) is type(literal) for literal in literals
+        )
+
+    if not isinstance(origin, type):
+        raise SkillArgException(f"unsupported dtype {tp}")
+
+    if not params:
+        return lambda value: isinstance(value, origin)
+
+    if issubclass(origin, tuple):
+        if len(params) == 2 and params[1] is Ellipsis:
+            item_check = _build_checker(params[0])
+            return lambda value: isinstance(value, origin) and all(
+                item_check(item) for item in value
+            )
+        item_checks = tuple(_build_checker(p) for p in params)
+        return lambda value: (
+            isinstance(value, origin)
+            and len(value) == len(item_checks)
+            and all(check(item) for check, item in zip(item_checks, value))
+        )
+
+    if issubclass(origin, Mapping):
+        key_check = _build_checker(params[0])
+        value_check = _build_checker(params[1]) if len(params) > 1 else _always
+        return lambda value: isinstance(value, origin) and all(
+            key_check(k) and value_check(v) for k, v in value.items()
+        )
+
+    if issubclass(origin, Iterable) and not issubclass(origin, (str, bytes)):
+        item_check = _build_checker(params[0])
+        return lambda value: isinstance(value, origin) and all(
+            item_check(item) for item in value
+        )
+
+    return lambda value: isinstance(value, origin)
+
+
+class ArgValidator:
+    def __init__(self, function_args: list["SkillArgAttr"]):
+        """
+        Instantiates an ArgValidator object.
+        The dtype of each argument is compiled once into a type checker, so validating
+        router input does not need to evaluate dtype strings on every call.
+
+        Args:
+        - function_args: list[SkillArgAttr] - list of SkillArgAttr objects that define the arguments of the function
+        """
+        self.function_args = function_args
+        self.checkers: list[tuple["SkillArgAttr", TypeChecker]] = [
+            (arg, compile_dtype(arg.dtype)) for arg in function_args
+        ]
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Compiled checkers are closures and can't be pickled, they are rebuilt on load.
+        return {"function_args": self.function_args}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["function_args"])
+
+    def validate(self, args: dict[str, Any]) -> dict[str, Any]:
+        """
+        Validates the input from the LLM router agent against the compiled arguments.
+
+        Args:
+        - args: dict[str, Any] - input from the LLM router agent
+
+        Returns:
+        - dict[str, Any] - keyword arguments for the execute method
+
+        Raises:
+        - SkillInputException - if the input is malformed, missing a required argument or of the wrong type
+        """
+        if not self.checkers:
+            return dict()
+
+        if isinstance(args, dict) and isinstance(args.get("input"), dict):
+            input_args: dict[str, Any] = args["input"]
+        else:
+            raise SkillInputException(
+                'Invalid input: expected a dictionary with the key "input" that\'s value is a dictionary.'
+            )
+
+        parsed_args: dict[str, Any] = dict()
+
+        for arg, check in self.checkers:
+            if arg.name in input_args:
+                value = input_args[arg.name]
+                if not check(value):
+                    raise SkillInputException(
+                        f'Invalid input: argument "{arg.name}" must be of type {arg.dtype}'
+                    )
+                parsed_args[arg.name] = value
+            elif arg.required and not arg.default:
+                raise SkillInputException(
+                    f'Invalid input: missing required argument "{arg.name}"'
+                )
+            else:
+                parsed_args[arg.name] = arg.default
+
+        return parsed_args
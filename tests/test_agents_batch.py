@@ -0,0 +1,138 @@
+import asyncio
+import json
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_llm import ScriptedLLM
+from src.agents.batch import BatchResult, load_checkpoint, run_batch
+from src.agents.router import AgentFlowOpenAI
+from src.skills.base import FunctionCallSkillAsync, SkillArgAttr, SkillMap
+
+
+class Track(FunctionCallSkillAsync):
+    def __init__(self):
+        super().__init__(
+            name="track",
+            description="Track a value",
+            function_args=[
+                SkillArgAttr(name="value", description="Value", dtype="str", required=True)
+            ],
+        )
+        self.active = 0
+        self.max_active = 0
+
+    async def execute(self, value: str) -> str:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return value
+
+
+class EchoLLM(ScriptedLLM):
+    """Answers with the user input, failing for inputs starting with "fail"."""
+
+    async def achat_with_tools(self, tools, messages, **kwargs):
+        response = await super().achat_with_tools(tools, messages, **kwargs)
+        if not response.message.additional_kwargs.get("tool_calls"):
+            user_input = [m for m in messages if m.role.value == "user"][-1].content
+            if user_input.startswith("fail"):
+                raise RuntimeError(user_input)
+            response.message.content = f"echo {user_input}"
+        return response
+
+
+def make_workflow() -> tuple[AgentFlowOpenAI, Track]:
+    skill = Track()
+    llm = EchoLLM([[("track", {"value": "x"})], "final"])
+    return AgentFlowOpenAI(llm=llm, skill_map=SkillMap(skills=[skill])), skill
+
+
+async def collect(iterator) -> list[BatchResult]:
+    return [result async for result in iterator]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_bounded_concurrency():
+    workflow, skill = make_workflow()
+    results = await collect(workflow.run_batch([f"q{i}" for i in range(10)], concurrency=3))
+
+    assert sorted(result.index for result in results) == list(range(10))
+    assert all(result.result == f"echo q{result.index}" for result in results)
+    assert skill.max_active == 3
+    # Per-input sessions are discarded once the run completes.
+    assert not any(("batch", i) in workflow.sessions for i in range(10))
+
+
+@pytest.mark.asyncio
+async def test_run_batch_async_iterator_and_errors():
+    workflow, _ = make_workflow()
+
+    async def inputs():
+        yield "a"
+        yield {"input": "fail now"}
+        yield {"input": "b", "session_id": "kept"}
+
+    results = {result.index: result for result in await collect(run_batch(workflow, inputs()))}
+    assert results[0] == BatchResult(index=0, result="echo a")
+    assert results[1] == BatchResult(index=1, error="RuntimeError: fail now")
+    assert results[2].result == "echo b"
+    assert "kept" in workflow.sessions
+
+
+@pytest.mark.asyncio
+async def test_run_batch_checkpoint_resume(tmp_path):
+    path = str(tmp_path / "batch.jsonl")
+    workflow, _ = make_workflow()
+    inputs = [f"q{i}" for i in range(5)]
+
+    # Stop consuming after two results, as if the process was interrupted.
+    batch = run_batch(workflow, inputs, concurrency=1, checkpoint_path=path)
+    first = [await batch.__anext__(), await batch.__anext__()]
+    await batch.aclose()
+    with open(path, "a") as f:
+        f.write('{"index": 4, "res')
+
+    assert load_checkpoint(path) == {result.index: result for result in first}
+
+    rest = await collect(run_batch(workflow, inputs, concurrency=2, checkpoint_path=path))
+    assert sorted(result.index for result in rest) == [2, 3, 4]
+    assert sorted(load_checkpoint(path)) == [0, 1, 2, 3, 4]
+
+
+def test_load_checkpoint_missing_file(tmp_path):
+    assert load_checkpoint(str(tmp_path / "missing.jsonl")) == {}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_without_sessions():
+    class Plain:
+        async def run(self, input):
+            return input.upper()
+
+    results = await collect(run_batch(Plain(), ["a", "b"]))
+    assert sorted(result.result for result in results) == ["A", "B"]
+    assert await collect(run_batch(Plain(), [])) == []
+
+
+@pytest.mark.asyncio
+async def test_run_batch_close_cancels_pending_runs():
+    cancelled = []
+
+    class Sleeper:
+        async def run(self, input):
+            try:
+                await asyncio.sleep(input)
+            except asyncio.CancelledError:
+                cancelled.append(input)
+                raise
+            return input
+
+    batch = run_batch(Sleeper(), [0.0, 10.0, 10.0], concurrency=3)
+    assert (await batch.__anext__()).result == 0.0
+    await batch.aclose()
+    await asyncio.sleep(0)
+    assert cancelled == [10.0, 10.0]
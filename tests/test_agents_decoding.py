@@ -0,0 +1,80 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.agents.decoding import decode_tool_arguments
+from src.agents.errors import ToolArgumentDecodeException
+
+
+def test_decode_tool_arguments_parsed():
+    arguments = {"a": 1, "b": {"c": [1, 2]}}
+    decoded = decode_tool_arguments({"input": arguments})
+    assert decoded == {"input": arguments}
+    # Already parsed arguments are used as-is, not re-serialised.
+    assert decoded["input"] is arguments
+
+    tool_kwargs = {"a": 1, "b": 2}
+    assert decode_tool_arguments(tool_kwargs) == {"input": {"a": 1, "b": 2}}
+    assert tool_kwargs == {"a": 1, "b": 2}
+
+
+def test_decode_tool_arguments_strings():
+    tool_kwargs = {"input": '{"a": 1, "b": {"c": [1, 2]}}'}
+    assert decode_tool_arguments(tool_kwargs) == {"input": {"a": 1, "b": {"c": [1, 2]}}}
+    assert tool_kwargs == {"input": '{"a": 1, "b": {"c": [1, 2]}}'}
+
+    assert decode_tool_arguments('{"input": {"a": 1}}') == {"input": {"a": 1}}
+    assert decode_tool_arguments('{"input": "{\\"a\\": 1}"}') == {"input": {"a": 1}}
+    assert decode_tool_arguments('{"a": 1}') == {"input": {"a": 1}}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '```json\n{"a": 1}\n```',
+        'Here are the arguments: {"a": 1}',
+        '{"a": 1,}',
+        '{"a": [1, 2,],}',
+    ],
+)
+def test_decode_tool_arguments_repairs(text):
+    assert decode_tool_arguments({"input": text}) == {"input": {"a": 1} if "[" not in text else {"a": [1, 2]}}
+
+
+@pytest.mark.parametrize(
+    "tool_kwargs, reason",
+    [
+        ({"input": "{'a': 1}"}, "invalid_json"),
+        ({"input": "__import__('os').system('echo hi')"}, "invalid_json"),
+        ({"input": "[1, 2]"}, "not_an_object"),
+        ({"input": 5}, "not_an_object"),
+        ("[1, 2]", "not_an_object"),
+        (None, "not_an_object"),
+        ({"input": "[" * 100000 + "]" * 100000}, "too_deep"),
+        ({"input": '{"a":' * 100000 + "1" + "}" * 100000}, "too_deep"),
+    ],
+)
+def test_decode_tool_arguments_errors(tool_kwargs, reason):
+    with pytest.raises(ToolArgumentDecodeException) as e:
+        decode_tool_arguments(tool_kwargs, max_chars=1_000_000)
+    assert e.value.reason == reason
+    assert e.value.message.startswith("Error: ")
+
+
+def test_decode_tool_arguments_max_chars():
+    with pytest.raises(ToolArgumentDecodeException) as e:
+        decode_tool_arguments({"input": '{"a": "' + "x" * 100 + '"}'}, max_chars=50)
+    assert e.value.reason == "too_large"
+
+
+def test_decode_tool_arguments_depth():
+    # Brackets and escaped quotes inside strings don't count towards the depth.
+    value = 'x[[[{{{\\"[[[[[['
+    nested = '{"a": ' * 60 + json.dumps(value) + "}" * 60
+    decoded = decode_tool_arguments({"input": nested})["input"]
+    for _ in range(59):
+        decoded = decoded["a"]
+    assert decoded["a"] == value
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from llama_index.core.llms import ChatMessage, ChatResponse
+
+from src.agents.llm_cache import ResponseCache, response_cache_key
+from src.agents.router import AgentFlowOpenAI, StopEvent
+from src.agents.tools import get_tool_registry
+from src.skills.base import SkillMap
+
+
+def make_response(content: str) -> ChatResponse:
+    return ChatResponse(message=ChatMessage(role="assistant", content=content))
+
+
+def test_response_cache_key():
+    messages = [ChatMessage(role="user", content="hello")]
+    key = response_cache_key("gpt-4o", messages, "tools", 0.1)
+    assert key == response_cache_key(
+        "gpt-4o", [ChatMessage(role="user", content="hello")], "tools", 0.1
+    )
+    assert key != response_cache_key("gpt-4o-mini", messages, "tools", 0.1)
+    assert key != response_cache_key("gpt-4o", messages, "other tools", 0.1)
+    assert key != response_cache_key("gpt-4o", messages, "tools", 0.2)
+    assert key != response_cache_key(
+        "gpt-4o", [ChatMessage(role="user", content="hi")], "tools", 0.1
+    )
+
+    # Non JSON values in additional_kwargs (e.g. provider tool call objects) are serialised too.
+    tool_call = ChatMessage(role="user", content="x")
+    with_objects = [
+        ChatMessage(
+            role="assistant",
+            content=None,
+            additional_kwargs={"tool_calls": [tool_call], "other": object},
+        )
+    ]
+    assert response_cache_key("gpt-4o", with_objects, "tools") == response_cache_key(
+        "gpt-4o", with_objects, "tools"
+    )
+
+
+def test_response_cache_memory_tier():
+    cache = ResponseCache(max_size=2)
+    assert cache.get("a") is None
+    cache.put("a", make_response("A"))
+    cache.put("b", make_response("B"))
+    assert cache.get("a").message.content == "A"
+    cache.put("c", make_response("C"))
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
+    cache.close()
+
+
+def test_response_cache_disk_tier(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path=path)
+    cache.put("a", make_response("A"))
+    cache.close()
+    cache.close()
+
+    cache = ResponseCache(max_size=1, path=path)
+    assert cache.get("a").message.content == "A"
+    assert cache.get("b") is None
+    cache.put("b", make_response("B"))
+    # Evicted from memory, still on disk.
+    assert cache.get("a").message.content == "A"
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_router_response_cache(tmp_path):
+    calls = []
+
+    async def achat_with_tools(model, messages, tools, **kwargs):
+        calls.append(messages)
+        return make_response(f"answer {len(calls)}")
+
+    llm = MagicMock()
+    llm.temperature = 0.1
+    llm.achat_with_tools = achat_with_tools
+    llm.get_tool_calls_from_response = lambda *args, **kwargs: []
+    skill_map = SkillMap(skills=[])
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"))
+
+    for _ in range(2):
+        workflow = AgentFlowOpenAI(llm=llm, skill_map=skill_map, response_cache=cache)
+        res = await workflow.router(
+            MagicMock(input=[ChatMessage(role="user", content="hello")])
+        )
+        assert isinstance(res, StopEvent)
+        assert res.result == "answer 1"
+    assert len(calls) == 1
+
+    res = await workflow.router(MagicMock(input=[ChatMessage(role="user", content="bye")]))
+    assert res.result == "answer 2"
+    assert get_tool_registry(skill_map).fingerprint
@@ -0,0 +1,155 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from llama_index.core.llms import ChatMessage
+
+from src.agents.memory import (
+    SUMMARY_PREFIX,
+    CompactingMemory,
+    digest_message,
+    digest_summarizer,
+)
+from src.agents.router import AgentFlowOpenAI
+from src.skills.base import SkillMap
+
+
+class CountingTokenizer:
+    """One token per word, counting how many times it was called."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text: str) -> list[str]:
+        self.calls += 1
+        return text.split()
+
+
+def user(content: str) -> ChatMessage:
+    return ChatMessage(role="user", content=content)
+
+
+def assistant(content: str = "") -> ChatMessage:
+    return ChatMessage(role="assistant", content=content)
+
+
+def tool(content: str, tool_call_id: str = "1") -> ChatMessage:
+    return ChatMessage(
+        role="tool", content=content, additional_kwargs={"tool_call_id": tool_call_id}
+    )
+
+
+def test_digest_message():
+    assert digest_message(user("hello   there")) == "user: hello there"
+    assert digest_message(assistant()) == "assistant: (called tools)"
+    assert digest_message(tool("x" * 10, "c1"), max_chars=4) == "tool result c1: xxxx... [10 chars]"
+    digested = tool("tool result c1: xxxx... [10 chars]", "c1")
+    assert digest_message(digested) == "tool result c1: xxxx... [10 chars]"
+    assert digest_summarizer("earlier", [user("a"), assistant("b")]) == "earlier\nuser: a\nassistant: b"
+
+
+def test_compacting_memory_incremental_token_counts():
+    tokenizer = CountingTokenizer()
+    memory = CompactingMemory.from_defaults(token_limit=100, tokenizer_fn=tokenizer)
+    memory.put(user("one two three"))
+    memory.put(assistant("four five"))
+    assert memory.token_count == 5
+    calls = tokenizer.calls
+    for _ in range(10):
+        assert [m.content for m in memory.get()] == ["one two three", "four five"]
+    assert tokenizer.calls == calls
+    assert memory.get_all() == memory.get()
+    assert memory.summary is None
+
+
+def test_compacting_memory_sliding_window_and_summary():
+    memory = CompactingMemory.from_defaults(
+        token_limit=40, summary_token_limit=20, tokenizer_fn=CountingTokenizer()
+    )
+    for i in range(10):
+        memory.put(user(f"question {i} a b"))
+        memory.put(assistant())
+        memory.put(tool(f"result {i}", f"c{i}"))
+        memory.put(assistant(f"answer {i}"))
+        assert memory.token_count <= 40
+
+    messages = memory.get()
+    assert messages[0].role.value == "system"
+    assert messages[0].content.startswith(SUMMARY_PREFIX)
+    # The window starts at a user message and ends with the latest answer.
+    assert messages[1].role.value == "user"
+    assert messages[-1].content == "answer 9"
+    # The summary rolls, keeping only the digests of the most recently evicted turns.
+    first_kept = int(messages[1].content.split()[1])
+    assert memory.summary.endswith(
+        f"tool result c{first_kept - 1}: result {first_kept - 1}\nassistant: answer {first_kept - 1}"
+    )
+    assert "question 0" not in memory.summary
+
+
+def test_compacting_memory_collapses_seen_tool_outputs():
+    memory = CompactingMemory.from_defaults(
+        token_limit=30,
+        summary_token_limit=0,
+        tool_digest_chars=10,
+        tokenizer_fn=CountingTokenizer(),
+    )
+    memory.put(user("go"))
+    memory.put(assistant())
+    memory.put(tool(" ".join(["word"] * 20), "c1"))
+    memory.put(tool("small", "c3"))
+    memory.put(tool(" ".join(["word"] * 20), "c4"))
+    memory.put(assistant())
+    memory.put(tool(" ".join(["more"] * 20), "c2"))
+
+    messages = memory.get()
+    # Tool outputs the LLM has seen are collapsed oldest first until the memory fits,
+    # the latest output is kept in full.
+    assert messages[2].content == "tool result c1: word word ... [99 chars]"
+    assert messages[2].additional_kwargs == {"tool_call_id": "c1"}
+    assert messages[3].content == "small"
+    assert messages[4].content.startswith("tool result c4:")
+    assert messages[6].content == " ".join(["more"] * 20)
+    assert memory.summary is None
+
+    memory.put(assistant("done"))
+    assert memory.get()[6].content.startswith("tool result c2:")
+
+
+def test_compacting_memory_set_reset_and_custom_summarizer():
+    summarizer = MagicMock(return_value="short")
+    memory = CompactingMemory.from_defaults(
+        token_limit=6,
+        summary_token_limit=1,
+        tokenizer_fn=CountingTokenizer(),
+        summarizer=summarizer,
+    )
+    memory.set([user("a b c"), assistant("d e"), user("f g h")])
+    assert memory.summary is None
+    summarizer.assert_called_once()
+    assert [m.content for m in memory.get()] == ["f g h"]
+
+    memory.reset()
+    assert memory.get() == []
+    assert memory.token_count == 0
+
+
+def test_compacting_memory_from_defaults():
+    llm = MagicMock()
+    llm.metadata.context_window = 1000
+    assert CompactingMemory.from_defaults(llm=llm).token_limit == 750
+    assert CompactingMemory.from_defaults().token_limit == 3000
+    assert CompactingMemory.class_name() == "CompactingMemory"
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_memory_factory():
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(),
+        skill_map=SkillMap(skills=[]),
+        memory_factory=lambda: CompactingMemory.from_defaults(token_limit=50),
+    )
+    assert isinstance(workflow.sessions.get("a"), CompactingMemory)
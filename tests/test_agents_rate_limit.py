@@ -0,0 +1,197 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_llm import ScriptedLLM, ScriptedRateLimitError
+from llama_index.core.llms import ChatMessage, ChatResponse
+from src.agents.rate_limit import (
+    AdaptiveConcurrency,
+    ModelBudget,
+    RateLimiter,
+    TokenBucket,
+    estimate_tokens,
+    usage_tokens,
+)
+from src.agents.router import AgentFlowOpenAI
+from src.skills.base import SkillMap
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def failing(errors: list, result="ok"):
+    calls = []
+
+    async def function():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return function, calls
+
+
+def test_estimate_and_usage_tokens():
+    messages = [ChatMessage(role="user", content="a" * 40), ChatMessage(role="assistant")]
+    assert estimate_tokens(messages, completion_tokens=5) == 15
+    assert usage_tokens(ChatResponse(message=ChatMessage(), raw={"usage": {"total_tokens": 7}})) == 7
+    raw = SimpleNamespace(usage=SimpleNamespace(total_tokens=9))
+    assert usage_tokens(SimpleNamespace(raw=raw)) == 9
+    assert usage_tokens(ChatResponse(message=ChatMessage())) is None
+    assert usage_tokens("text") is None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket():
+    fake = FakeTime()
+    bucket = TokenBucket(60, clock=fake.clock, sleep=fake.sleep)
+    await bucket.acquire(60)
+    assert fake.sleeps == []
+    await bucket.acquire(2)
+    assert fake.sleeps == [2.0]
+    # Larger than the bucket: waits until it is full instead of forever.
+    await bucket.acquire(1000)
+    assert fake.now == 62.0
+
+    bucket.adjust(30)
+    assert bucket.level == -30
+    bucket.adjust(-100)
+    assert bucket.level == 60
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency():
+    concurrency = AdaptiveConcurrency(initial=2, minimum=1, maximum=3)
+    concurrency.on_success()
+    assert concurrency.limit == 2.5
+    for _ in range(10):
+        concurrency.on_success()
+    assert concurrency.limit == 3
+    for _ in range(5):
+        concurrency.on_throttle()
+    assert concurrency.limit == 1
+
+    order = []
+
+    async def work(tag: str):
+        async with concurrency:
+            order.append(f"start {tag}")
+            await asyncio.sleep(0.01)
+            order.append(f"end {tag}")
+
+    await asyncio.gather(work("a"), work("b"))
+    assert order == ["start a", "end a", "start b", "end b"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retries_with_backoff():
+    fake = FakeTime()
+    limiter = RateLimiter(initial_concurrency=8, base_delay=1.0, sleep=fake.sleep, clock=fake.clock)
+    function, calls = failing([HTTPError(429), HTTPError(503), ConnectionError()])
+    with patch("src.agents.rate_limit.random.uniform", side_effect=lambda a, b: b):
+        assert await limiter.call("gpt-4o", function) == "ok"
+    assert len(calls) == 4
+    assert fake.sleeps == [1.0, 2.0, 4.0]
+    assert limiter.concurrency_limit("gpt-4o") == 4
+    assert limiter.stats() == {
+        "calls": 1,
+        "retries": 3,
+        "throttled": 1,
+        "failures": 0,
+        "concurrency_limits": {"gpt-4o": 4},
+    }
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_retry_after_and_max_delay():
+    fake = FakeTime()
+    limiter = RateLimiter(max_delay=10.0, sleep=fake.sleep, clock=fake.clock)
+    function, _ = failing([HTTPError(429, {"retry-after": "3"}), HTTPError(429, {"retry-after": "60"})])
+    await limiter.call("m", function)
+    assert fake.sleeps == [3.0, 10.0]
+
+    assert 0 <= limiter.backoff(10) <= 10.0
+    assert limiter.backoff(0, HTTPError(429, {"retry-after": "soon"})) <= limiter.base_delay
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_gives_up():
+    fake = FakeTime()
+    limiter = RateLimiter(max_retries=2, sleep=fake.sleep, clock=fake.clock)
+    function, calls = failing([ScriptedRateLimitError() for _ in range(5)])
+    with pytest.raises(ScriptedRateLimitError):
+        await limiter.call("m", function)
+    assert len(calls) == 3
+
+    function, calls = failing([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        await limiter.call("m", function)
+    assert len(calls) == 1
+    assert limiter.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_budgets():
+    fake = FakeTime()
+    limiter = RateLimiter(
+        default_budget=ModelBudget(requests_per_minute=60),
+        budgets={"small": ModelBudget(tokens_per_minute=600)},
+        sleep=fake.sleep,
+        clock=fake.clock,
+    )
+    response = ChatResponse(message=ChatMessage(), raw={"usage": {"total_tokens": 500}})
+
+    async def function():
+        return response
+
+    for _ in range(61):
+        await limiter.call("big", function)
+    assert fake.now == 1.0
+
+    # The estimate is corrected with the reported usage.
+    await limiter.call("small", function, estimated_tokens=100)
+    assert limiter._state("small").tokens.level == 100
+    await limiter.call("small", function, estimated_tokens=200)
+    assert fake.now == 11.0
+    await limiter.call("small", function)
+    assert fake.now == 41.0
+    assert limiter._state("small").tokens.level == -500
+
+
+@pytest.mark.asyncio
+async def test_router_with_rate_limiter_against_throttling_llm():
+    # The stand-in rejects more than 2 concurrent calls with 429s.
+    llm = ScriptedLLM(["done"], latency=0.01, max_in_flight=2)
+    limiter = RateLimiter(initial_concurrency=8, base_delay=0.005)
+    workflow = AgentFlowOpenAI(llm=llm, skill_map=SkillMap(skills=[]), rate_limiter=limiter)
+    results = [result async for result in workflow.run_batch([f"q{i}" for i in range(20)], concurrency=8)]
+
+    assert all(result.result == "done" for result in results)
+    assert llm.throttled > 0
+    assert limiter.stats()["throttled"] == llm.throttled
+    assert limiter.concurrency_limit("gpt-4o") < 8
+
+    workflow = AgentFlowOpenAI(llm=llm, skill_map=SkillMap(skills=[]))
+    results = [result async for result in workflow.run_batch([f"q{i}" for i in range(4)], concurrency=4)]
+    assert any(result.error == "ScriptedRateLimitError: Rate limit exceeded" for result in results)
@@ -1,3 +1,5 @@
+import asyncio
+import time
 import pytest
 from typing import Union
 from unittest.mock import Mock, MagicMock
@@ -6,8 +8,14 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from src.agents.router import AgentFlowOpenAI, RouterInputEvent, StopEvent, ToolCallEvent, ChatMessage, ToolSelection
+from benchmarks.fake_llm import ScriptedLLM
+from src.agents.llm_cache import ResponseCache
+from src.agents.tool_selection import ToolSelector
+from llama_index.core.workflow import StartEvent
+from src.agents.router import AgentFlowOpenAI, RouterInputEvent, StopEvent, ToolCallEvent, ChatMessage, ToolSelection, TokenDeltaEvent
 from src.skills.base import SkillMap, SkillArgAttr, FunctionCallSkill, FunctionCallSkillAsync
+from src.skills.execution import ExecutionPolicy, SkillExecutor
+from src.skills.results import ReadToolResult, ResultStore
 
 class Multiply(FunctionCallSkill):
     def __init__(self):
@@ -163,4 +171,379 @@ async def test_agent_flow_openai_tool_call_handler():
         )]
     )
     res = await workflow.tool_call_handler(tool)
-    assert isinstance(res, RouterInputEvent)
\ No newline at end of file
+    assert isinstance(res, RouterInputEvent)
+
+class Sleep(FunctionCallSkillAsync):
+    def __init__(self):
+        super().__init__(
+            name="sleep",
+            description="Sleep for a number of seconds",
+            function_args=[
+                SkillArgAttr(
+                    name="seconds",
+                    description="Seconds to sleep",
+                    dtype="float",
+                    required=True,
+                ),
+            ],
+        )
+        self.active = 0
+        self.max_active = 0
+
+    async def execute(self, seconds: float) -> str:
+        if seconds < 0:
+            raise ValueError("negative sleep")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(seconds)
+        self.active -= 1
+        return f"slept {seconds}"
+
+
+def sleep_tool_calls(seconds: list[float]) -> ToolCallEvent:
+    return ToolCallEvent(
+        tool_calls=[
+            ToolSelection(
+                tool_name="sleep",
+                tool_kwargs={"input": f'{{"seconds": {s}}}'},
+                tool_id=str(i),
+            )
+            for i, s in enumerate(seconds)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_concurrent():
+    skill = Sleep()
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(), skill_map=SkillMap(skills=[skill]), model="gpt-4o"
+    )
+    await workflow.tool_call_handler(sleep_tool_calls([0.05, 0.01, -1.0, 0.03]))
+
+    messages = workflow.memory.get_all()
+    assert [m.additional_kwargs["tool_call_id"] for m in messages] == ["0", "1", "2", "3"]
+    assert messages[0].content == "slept 0.05"
+    assert messages[2].content == "Error: ValueError: negative sleep"
+    assert messages[3].content == "slept 0.03"
+    assert skill.max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_concurrency_cap():
+    skill = Sleep()
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(),
+        skill_map=SkillMap(skills=[skill]),
+        model="gpt-4o",
+        max_concurrent_tool_calls=2,
+    )
+    await workflow.tool_call_handler(sleep_tool_calls([0.01] * 5))
+
+    assert len(workflow.memory.get_all()) == 5
+    assert skill.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_executor():
+    executor = MagicMock()
+
+    async def run(function_callable, arguments, policy, timeout=None):
+        return f"{policy.value}: {function_callable(arguments)}"
+
+    executor.run = run
+    skill = Multiply()
+    skill.execution_policy = ExecutionPolicy.THREAD
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(),
+        skill_map=SkillMap(skills=[skill]),
+        model="gpt-4o",
+        skill_executor=executor,
+    )
+    await workflow.tool_call_handler(
+        ToolCallEvent(
+            tool_calls=[
+                ToolSelection(
+                    tool_name="multiply",
+                    tool_kwargs={"input": '{"a": 2, "b": 3}'},
+                    tool_id="1",
+                )
+            ]
+        )
+    )
+    assert workflow.memory.get_all()[0].content == "thread: The answer is 6."
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_decode_error():
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(), skill_map=SkillMap(skills=[Multiply()]), model="gpt-4o"
+    )
+    tool_kwargs = {"input": "__import__('os').getcwd()"}
+    await workflow.tool_call_handler(
+        ToolCallEvent(
+            tool_calls=[
+                ToolSelection(tool_name="multiply", tool_kwargs=tool_kwargs, tool_id="1"),
+                ToolSelection(
+                    tool_name="multiply",
+                    tool_kwargs={"input": {"a": 2, "b": 3}},
+                    tool_id="2",
+                ),
+            ]
+        )
+    )
+    messages = workflow.memory.get_all()
+    assert messages[0].content.startswith("Error: tool arguments are not valid JSON")
+    assert messages[1].content == "The answer is 6."
+    assert tool_kwargs == {"input": "__import__('os').getcwd()"}
+
+
+async def collect_stream(workflow: AgentFlowOpenAI, **kwargs) -> tuple[str, list[str]]:
+    handler = workflow.run(**kwargs)
+    deltas = [
+        ev.delta
+        async for ev in handler.stream_events()
+        if isinstance(ev, TokenDeltaEvent)
+    ]
+    return await handler, deltas
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_stream():
+    llm = ScriptedLLM([[("multiply", {"a": 2, "b": 3})], "The answer is 6."])
+    workflow = AgentFlowOpenAI(
+        llm=llm, skill_map=SkillMap(skills=[Multiply()]), stream=True
+    )
+    result, deltas = await collect_stream(workflow, input="2 * 3?", session_id="s")
+
+    # Only the final answer is streamed, not the tool call turn.
+    assert deltas == ["The", " answer", " is", " 6."]
+    assert result == "The answer is 6."
+    messages = workflow.sessions.get("s").get_all()
+    assert [m.role.value for m in messages] == ["user", "assistant", "tool", "assistant"]
+    assert messages[-1].content == "The answer is 6."
+
+    # Streaming without a context (e.g. calling the step directly) still assembles the message.
+    res = await workflow.router(
+        RouterInputEvent(input=[ChatMessage(role="user", content="hi")], session_id="t")
+    )
+    assert isinstance(res, ToolCallEvent)
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_stream_empty_and_cached():
+    llm = MagicMock()
+
+    async def astream_chat_with_tools(**kwargs):
+        async def gen():
+            return
+            yield
+
+        return gen()
+
+    llm.astream_chat_with_tools = astream_chat_with_tools
+    llm.get_tool_calls_from_response = lambda *args, **kwargs: []
+    workflow = AgentFlowOpenAI(llm=llm, skill_map=SkillMap(skills=[]), stream=True)
+    res = await workflow.router(RouterInputEvent(input=[ChatMessage(role="user", content="hi")]))
+    assert res.result == ""
+
+    cache = ResponseCache()
+    llm = ScriptedLLM(["cached answer"])
+    workflow = AgentFlowOpenAI(
+        llm=llm, skill_map=SkillMap(skills=[]), stream=True, response_cache=cache
+    )
+    first = await collect_stream(workflow, input="hi", session_id="a")
+    second = await collect_stream(workflow, input="hi", session_id="b")
+    assert first == ("cached answer", ["cached", " answer"])
+    assert second == ("cached answer", ["cached answer"])
+    assert llm.calls == 1
+
+
+class Record(FunctionCallSkillAsync):
+    def __init__(self):
+        super().__init__(
+            name="record",
+            description="Record a tag",
+            function_args=[
+                SkillArgAttr(name="tag", description="Tag", dtype="str", required=True)
+            ],
+        )
+        self.started = []
+
+    async def execute(self, tag: str) -> str:
+        self.started.append(tag)
+        await asyncio.sleep(0.01 * (3 - len(self.started)))
+        return f"recorded {tag}"
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_eager_tool_dispatch():
+    skill = Record()
+    llm = ScriptedLLM(
+        [[("record", {"tag": str(i)}) for i in range(3)], "done"], chunk_latency=0.01
+    )
+    workflow = AgentFlowOpenAI(
+        llm=llm,
+        skill_map=SkillMap(skills=[skill]),
+        stream=True,
+        eager_tool_dispatch=True,
+    )
+    ev = await workflow.prepare_agent(StartEvent(input="go", session_id="s"))
+    ev = await workflow.router(ev)
+    assert isinstance(ev, ToolCallEvent)
+    await asyncio.sleep(0)
+    # The first two calls were dispatched while the third was still streaming.
+    assert skill.started == ["0", "1"]
+
+    ev = await workflow.tool_call_handler(ev)
+    assert skill.started == ["0", "1", "2"]
+    tool_messages = [m for m in workflow.sessions.get("s").get_all() if m.role.value == "tool"]
+    assert [m.content for m in tool_messages] == ["recorded 0", "recorded 1", "recorded 2"]
+    assert workflow._dispatched_tool_calls == {}
+
+    # Without eager dispatch nothing starts before tool_call_handler.
+    skill = Record()
+    workflow = AgentFlowOpenAI(
+        llm=llm, skill_map=SkillMap(skills=[skill]), stream=True
+    )
+    ev = await workflow.prepare_agent(StartEvent(input="go", session_id="s"))
+    ev = await workflow.router(ev)
+    await asyncio.sleep(0)
+    assert skill.started == []
+    assert await workflow.run(input="go", session_id="t") == "done"
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_allow_parallel_tool_calls():
+    llm = MagicMock()
+    seen = []
+
+    async def achat_with_tools(**kwargs):
+        seen.append(kwargs["allow_parallel_tool_calls"])
+        return Mock(message=Mock(content="cheese"))
+
+    llm.achat_with_tools = achat_with_tools
+    llm.get_tool_calls_from_response = mock_get_tool_calls_from_response_empty
+    for allow in (True, False):
+        workflow = AgentFlowOpenAI(
+            llm=llm, skill_map=SkillMap(skills=[]), allow_parallel_tool_calls=allow
+        )
+        await workflow.router(RouterInputEvent(input=[ChatMessage(role="user", content="hi")]))
+    assert seen == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_result_store():
+    store = ResultStore(spill_threshold_chars=10, excerpt_chars=5)
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(),
+        skill_map=SkillMap(skills=[Sleep(), ReadToolResult(store)]),
+        model="gpt-4o",
+        result_store=store,
+    )
+    await workflow.tool_call_handler(sleep_tool_calls([0.0, 0.015]))
+    messages = workflow.memory.get_all()
+    assert messages[0].content == "slept 0.0"
+    assert messages[1].content.startswith("[Result too large")
+    assert messages[1].content.endswith("\nslept")
+    handle = store.store("slept 0.015")
+
+    await workflow.tool_call_handler(
+        ToolCallEvent(
+            tool_calls=[
+                ToolSelection(
+                    tool_name="read_tool_result",
+                    tool_kwargs={"input": f'{{"handle": "{handle}", "length": 100}}'},
+                    tool_id="2",
+                )
+            ]
+        )
+    )
+    assert workflow.memory.get_all()[-1].content == "[Characters 0-11 of 11]\nslept 0.015"
+    store.close()
+
+
+class ToolRecordingLLM(ScriptedLLM):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offered = []
+
+    async def achat_with_tools(self, tools, messages, **kwargs):
+        self.offered.append([tool.metadata.name for tool in tools])
+        return await super().achat_with_tools(tools, messages, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_selector():
+    llm = ToolRecordingLLM([[("multiply", {"a": 2, "b": 3}), ("sleep", {"seconds": 0})], "6"])
+    selector = ToolSelector(top_k=1)
+    workflow = AgentFlowOpenAI(
+        llm=llm,
+        skill_map=SkillMap(skills=[Sleep(), Multiply(), Record()]),
+        tool_selector=selector,
+    )
+    result = await workflow.run(input="multiply 2 by 3", session_id="s")
+    assert result == "6"
+    # The multiply call is remembered, sleep was requested without being offered.
+    assert llm.offered == [["multiply"], ["sleep", "multiply"]]
+    assert selector.stats()["requests"] == 2
+    assert selector.stats()["unoffered_requests"] == 1
+
+
+class Hang(FunctionCallSkillAsync):
+    def __init__(self, timeout=None):
+        super().__init__(name="hang", description="Never returns", timeout=timeout)
+        self.cancelled = False
+
+    async def execute(self) -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "done"
+
+
+class HangSync(FunctionCallSkill):
+    def __init__(self):
+        super().__init__(
+            name="hang_sync",
+            description="Blocks a worker thread",
+            execution_policy=ExecutionPolicy.THREAD,
+        )
+
+    def execute(self) -> str:
+        time.sleep(0.2)
+        return "done"
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_tool_call_handler_skill_timeouts():
+    hang = Hang(timeout=0.02)
+    executor = SkillExecutor(max_thread_workers=1)
+    workflow = AgentFlowOpenAI(
+        llm=MagicMock(),
+        skill_map=SkillMap(skills=[hang, HangSync(), Sleep()]),
+        skill_executor=executor,
+        default_skill_timeout=0.05,
+    )
+    started = time.monotonic()
+    await workflow.tool_call_handler(
+        ToolCallEvent(
+            tool_calls=[
+                ToolSelection(tool_name="hang", tool_kwargs={"input": "{}"}, tool_id="1"),
+                ToolSelection(tool_name="hang_sync", tool_kwargs={"input": "{}"}, tool_id="2"),
+                ToolSelection(tool_name="sleep", tool_kwargs={"input": '{"seconds": 0.0}'}, tool_id="3"),
+            ]
+        )
+    )
+    assert time.monotonic() - started < 0.2
+    messages = workflow.memory.get_all()
+    assert messages[0].content == "Error: Skill timed out after 0.02 seconds"
+    assert messages[1].content == "Error: Skill timed out after 0.05 seconds"
+    assert messages[2].content == "slept 0.0"
+    assert hang.cancelled
+    assert executor.abandoned(ExecutionPolicy.THREAD) == 1
+    assert workflow.telemetry.registry.counter("skill.timeouts", skill="hang") >= 1
+    executor.shutdown()
+    assert executor.abandoned(ExecutionPolicy.THREAD) == 0
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.workflow import StartEvent
+
+from src.agents.router import AgentFlowOpenAI, ChatMessage, RouterInputEvent
+from src.agents.sessions import DEFAULT_SESSION_ID, SessionStore
+from src.skills.base import SkillMap
+
+
+def memory_factory() -> ChatMemoryBuffer:
+    return ChatMemoryBuffer.from_defaults(token_limit=1000)
+
+
+def test_session_store_get():
+    store = SessionStore(memory_factory=memory_factory)
+    memory = store.get("a")
+    assert store.get("a") is memory
+    assert store.get("b") is not memory
+    assert "a" in store
+    assert len(store) == 2
+
+    assert store.pop("a") is memory
+    assert store.pop("a") is None
+    assert "a" not in store
+
+
+def test_session_store_lru_eviction():
+    store = SessionStore(memory_factory=memory_factory, max_sessions=2, ttl=None)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert "a" in store
+    assert "b" not in store
+    assert "c" in store
+    assert len(store) == 2
+
+
+def test_session_store_ttl_eviction():
+    store = SessionStore(memory_factory=memory_factory, ttl=10.0)
+    with patch("src.agents.sessions.time.monotonic", return_value=100.0):
+        memory = store.get("a")
+        store.get("b")
+    with patch("src.agents.sessions.time.monotonic", return_value=105.0):
+        store.get("b")
+    with patch("src.agents.sessions.time.monotonic", return_value=111.0):
+        store.get("c")
+    assert "a" not in store
+    assert "b" in store
+    with patch("src.agents.sessions.time.monotonic", return_value=112.0):
+        assert store.get("a") is not memory
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_sessions():
+    workflow = AgentFlowOpenAI(llm=MagicMock(), skill_map=SkillMap(skills=[]))
+
+    res = await workflow.prepare_agent(StartEvent(input="hello", session_id="a"))
+    assert isinstance(res, RouterInputEvent)
+    assert res.session_id == "a"
+    await workflow.prepare_agent(StartEvent(input="hi", session_id="b"))
+    await workflow.prepare_agent(StartEvent(input="again", session_id="a"))
+    await workflow.prepare_agent(StartEvent(input="default"))
+
+    assert [m.content for m in workflow.sessions.get("a").get_all()] == [
+        "hello",
+        "again",
+    ]
+    assert [m.content for m in workflow.sessions.get("b").get_all()] == ["hi"]
+    assert workflow.memory is workflow.sessions.get(DEFAULT_SESSION_ID)
+    assert [m.content for m in workflow.memory.get_all()] == ["default"]
+
+
+@pytest.mark.asyncio
+async def test_agent_flow_openai_run_concurrent_sessions():
+    llm = MagicMock()
+
+    async def achat_with_tools(model, messages, tools, **kwargs):
+        return MagicMock(
+            message=ChatMessage(role="assistant", content=f"echo {messages[-1].content}")
+        )
+
+    llm.achat_with_tools = achat_with_tools
+    llm.get_tool_calls_from_response = lambda *args, **kwargs: []
+    workflow = AgentFlowOpenAI(llm=llm, skill_map=SkillMap(skills=[]))
+
+    results = [
+        await workflow.run(input=f"message {i}", session_id=f"session {i % 2}")
+        for i in range(4)
+    ]
+    assert results == [f"echo message {i}" for i in range(4)]
+    assert len(workflow.sessions.get("session 0").get_all()) == 4
+    assert len(workflow.sessions.get("session 1").get_all()) == 4
@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from benchmarks.fake_llm import ScriptedLLM
+from llama_index.core.llms import ChatMessage, ChatResponse
+from src.agents.memory import CompactingMemory
+from src.agents.router import AgentFlowOpenAI
+from src.agents.telemetry import (
+    COUNT_BUCKETS,
+    MetricsRegistry,
+    Telemetry,
+    configure_telemetry,
+    metric_key,
+)
+from src.skills.base import FunctionCallSkill, SkillArgAttr, SkillMap
+
+
+class Divide(FunctionCallSkill):
+    def __init__(self):
+        super().__init__(
+            name="divide",
+            description="Divide a by b",
+            function_args=[
+                SkillArgAttr(name="a", description="a", dtype="float", required=True),
+                SkillArgAttr(name="b", description="b", dtype="float", required=True),
+            ],
+        )
+
+    def execute(self, a: float, b: float) -> str:
+        return str(a / b)
+
+
+class UsageLLM(ScriptedLLM):
+    async def achat_with_tools(self, tools, messages, **kwargs):
+        response = await super().achat_with_tools(tools, messages, **kwargs)
+        return ChatResponse(
+            message=response.message,
+            raw={"usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}},
+        )
+
+
+def test_metric_key():
+    assert metric_key("calls", {}) == "calls"
+    assert metric_key("calls", {"skill": "a", "model": "m"}) == "calls{model=m,skill=a}"
+
+
+def test_metrics_registry():
+    registry = MetricsRegistry()
+    registry.increment("calls", skill="a")
+    registry.increment("calls", 2, skill="a")
+    for value in (0.002, 0.02, 2.0, 100.0):
+        registry.record("latency", value, skill="a")
+    registry.record("size", 3, COUNT_BUCKETS)
+
+    assert registry.counter("calls", skill="a") == 3
+    assert registry.counter("calls", skill="b") == 0
+    latency = registry.histogram("latency", skill="a")
+    assert latency["count"] == 4
+    assert latency["min"] == 0.002 and latency["max"] == 100.0
+    assert latency["mean"] == pytest.approx(25.5055)
+    assert latency["buckets"]["0.001"] == 0
+    assert latency["buckets"]["0.0025"] == 1
+    assert latency["buckets"]["2.5"] == 3
+    assert latency["buckets"]["60.0"] == 3
+    assert registry.histogram("size")["buckets"]["4"] == 1
+    assert registry.histogram("missing") is None
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"] == {"calls{skill=a}": 3}
+    assert set(snapshot["histograms"]) == {"latency{skill=a}", "size"}
+    registry.reset()
+    assert registry.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_telemetry_span_records_errors():
+    exporter = InMemorySpanExporter()
+    telemetry = configure_telemetry(span_exporter=exporter, metric_reader=InMemoryMetricReader())
+    with pytest.raises(ValueError):
+        with telemetry.span("work", "work.duration", kind="test"):
+            raise ValueError("boom")
+    telemetry.tracer_provider.force_flush()
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "work"
+    assert span.attributes["kind"] == "test"
+    assert span.status.status_code == StatusCode.ERROR
+    assert telemetry.registry.histogram("work.duration", kind="test")["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_workflow_telemetry():
+    exporter = InMemorySpanExporter()
+    reader = InMemoryMetricReader()
+    telemetry = configure_telemetry(span_exporter=exporter, metric_reader=reader)
+    llm = UsageLLM(
+        [
+            [
+                ("divide", {"a": 1.0, "b": 2.0}),
+                ("divide", {"a": 1.0, "b": 0.0}),
+                ("divide", {"a": 1, "b": 2}),
+                ("missing", {}),
+            ],
+            "done",
+        ]
+    )
+    workflow = AgentFlowOpenAI(
+        llm=llm,
+        skill_map=SkillMap(skills=[Divide()]),
+        telemetry=telemetry,
+        memory_factory=CompactingMemory.from_defaults,
+    )
+    assert await workflow.run(input="divide", session_id="s") == "done"
+    telemetry.tracer_provider.force_flush()
+
+    registry = telemetry.registry
+    for step_name in ("prepare_agent", "router", "tool_call_handler"):
+        assert registry.histogram("workflow.step.duration", step=step_name)["count"] >= 1
+    assert registry.histogram("workflow.step.duration", step="router")["count"] == 2
+    assert registry.histogram("workflow.iterations")["sum"] == 2
+    assert registry.counter("llm.calls", model="gpt-4o") == 2
+    assert registry.histogram("llm.prompt_tokens", model="gpt-4o")["sum"] == 200
+    assert registry.histogram("llm.completion_tokens", model="gpt-4o")["sum"] == 40
+    assert registry.histogram("memory.messages")["max"] == 7
+    assert registry.histogram("memory.tokens")["count"] == 2
+    assert registry.counter("skill.calls", skill="divide") == 3
+    assert registry.counter("skill.errors", skill="divide") == 2
+    assert registry.counter("skill.errors", skill="missing") == 1
+    assert registry.histogram("skill.duration", skill="divide")["count"] == 3
+
+    spans = exporter.get_finished_spans()
+    names = [span.name for span in spans]
+    assert names.count("workflow.step router") == 2
+    assert names.count("skill divide") == 3
+    errors = [span for span in spans if span.status.status_code == StatusCode.ERROR]
+    assert sorted(span.name for span in errors) == ["skill divide", "skill divide", "skill missing"]
+
+    # The same metrics are exported through the OpenTelemetry SDK.
+    exported = {
+        metric.name
+        for resource_metrics in reader.get_metrics_data().resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    assert {"workflow.step.duration", "skill.calls", "skill.errors", "llm.prompt_tokens"} <= exported
+
+
+def test_default_telemetry_is_no_op_without_providers():
+    telemetry = Telemetry()
+    with telemetry.span("work", "work.duration") as span:
+        assert not span.is_recording()
+    telemetry.increment("calls")
+    assert telemetry.registry.counter("calls") == 1
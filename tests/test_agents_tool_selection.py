@@ -0,0 +1,161 @@
+import pytest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from llama_index.core.llms import ChatMessage
+from openai.types.chat.chat_completion_message_tool_call import ChatCompletionMessageToolCall, Function
+from llama_index.core.tools import ToolSelection
+from src.agents.tool_selection import (
+    BM25Index,
+    ToolSelector,
+    latest_user_query,
+    skill_document,
+    tokenize,
+    used_tool_names,
+)
+from src.agents.tools import get_tool_registry
+from src.skills.base import FunctionCallSkill, SkillArgAttr, SkillMap
+
+
+class Named(FunctionCallSkill):
+    def __init__(self, name: str, description: str):
+        super().__init__(
+            name=name,
+            description=description,
+            function_args=[
+                SkillArgAttr(
+                    name="value",
+                    description="Input value",
+                    dtype="str",
+                    required=True,
+                ),
+            ],
+        )
+
+    def execute(self, value: str) -> str:
+        return value
+
+
+def make_skill_map() -> SkillMap:
+    return SkillMap(
+        skills=[
+            Named("get_weather", "Current weather forecast for a city"),
+            Named("convert_currency", "Convert an amount between currencies"),
+            Named("send_email", "Send an email message to a recipient"),
+            Named("search_flights", "Search flights between two airports"),
+        ]
+    )
+
+
+def test_tokenize():
+    assert tokenize("get_weather: Weather in London, 2024!") == [
+        "get", "weather", "weather", "in", "london", "2024"
+    ]
+
+
+def test_skill_document():
+    skill = Named("get_weather", "Current weather")
+    assert skill_document(skill.get_function_dict()) == (
+        "get_weather Current weather value Input value"
+    )
+
+
+def test_bm25_index():
+    index = BM25Index(
+        {
+            "a": "weather forecast",
+            "b": "weather weather weather report for the city of london",
+            "c": "currency conversion",
+        }
+    )
+    assert index.top_k("weather", 5) == ["a", "b"]
+    assert index.top_k("currency weather", 1) == ["c"]
+    assert index.top_k("unknown terms", 5) == []
+    assert BM25Index({}).top_k("weather", 3) == []
+
+
+def test_used_tool_names_and_query():
+    messages = [
+        ChatMessage(role="user", content="first"),
+        ChatMessage(
+            role="assistant",
+            content="",
+            additional_kwargs={
+                "tool_calls": [
+                    ToolSelection(tool_id="1", tool_name="get_weather", tool_kwargs={}),
+                    {"function": {"name": "send_email"}},
+                    ChatCompletionMessageToolCall(
+                        id="2",
+                        type="function",
+                        function=Function(name="search_flights", arguments="{}"),
+                    ),
+                ]
+            },
+        ),
+        ChatMessage(role="tool", content="ok", additional_kwargs={"tool_call_id": "1"}),
+        ChatMessage(role="user", content="second"),
+        ChatMessage(role="assistant", content="answer"),
+    ]
+    assert used_tool_names(messages) == {"get_weather", "send_email", "search_flights"}
+    assert latest_user_query(messages) == "second"
+    assert latest_user_query([]) == ""
+
+
+def test_tool_selector_all_tools_when_small():
+    skill_map = make_skill_map()
+    selector = ToolSelector(top_k=10)
+    subset = selector.select(skill_map, [ChatMessage(role="user", content="weather")])
+    registry = get_tool_registry(skill_map)
+    assert subset.tools == registry.tools
+    assert subset.fingerprint == registry.fingerprint
+
+
+def test_tool_selector_top_k():
+    skill_map = make_skill_map()
+    selector = ToolSelector(top_k=1)
+    subset = selector.select(
+        skill_map, [ChatMessage(role="user", content="What's the weather in Paris?")]
+    )
+    assert subset.names == {"get_weather"}
+    assert subset.fingerprint != get_tool_registry(skill_map).fingerprint
+
+    # Tools already used in the session stay available, in SkillMap order.
+    messages = [
+        ChatMessage(role="user", content="book flights"),
+        ChatMessage(
+            role="assistant",
+            content="",
+            additional_kwargs={
+                "tool_calls": [
+                    ToolSelection(tool_id="1", tool_name="send_email", tool_kwargs={})
+                ]
+            },
+        ),
+    ]
+    subset = selector.select(skill_map, messages)
+    assert [tool.metadata.name for tool in subset.tools] == ["send_email", "search_flights"]
+
+    # Nothing matches: fall back to the first tools rather than offering none.
+    subset = selector.select(skill_map, [ChatMessage(role="user", content="hello")])
+    assert subset.names == {"get_weather"}
+    assert selector.stats() == {
+        "selections": 3,
+        "tools_offered": 4,
+        "requests": 0,
+        "unoffered_requests": 0,
+    }
+
+    selector.record_requests(subset, ["get_weather", "send_email"])
+    assert selector.stats()["requests"] == 2
+    assert selector.stats()["unoffered_requests"] == 1
+
+
+def test_tool_selector_rebuilds_on_skill_map_change():
+    skill_map = make_skill_map()
+    selector = ToolSelector(top_k=1)
+    query = [ChatMessage(role="user", content="translate text")]
+    assert selector.select(skill_map, query).names == {"get_weather"}
+    skill_map.add_skill(Named("translate", "Translate text to another language"))
+    assert selector.select(skill_map, query).names == {"translate"}
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import MagicMock
+import dataclasses
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.agents.router import AgentFlowOpenAI
+from src.agents.tools import ToolRegistry, get_tool_registry
+from src.skills.base import FunctionCallSkill, SkillArgAttr, SkillMap
+
+
+class Echo(FunctionCallSkill):
+    def __init__(self, name: str = "echo"):
+        super().__init__(
+            name=name,
+            description="Echo the text back",
+            function_args=[
+                SkillArgAttr(
+                    name="text",
+                    description="Text to echo",
+                    dtype="str",
+                    required=True,
+                )
+            ],
+        )
+
+    def execute(self, text: str) -> str:
+        return text
+
+
+def test_tool_registry_from_skill_map():
+    skill_map = SkillMap(skills=[Echo("a"), Echo("b")])
+    registry = ToolRegistry.from_skill_map(skill_map)
+    assert [tool.metadata.name for tool in registry.tools] == ["a", "b"]
+    assert registry.tools_by_name["b"] is registry.tools[1]
+    assert registry.version == skill_map.version
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        registry.tools = ()
+    with pytest.raises(TypeError):
+        registry.tools_by_name["c"] = registry.tools[0]
+
+
+def test_get_tool_registry_cached():
+    skill_map = SkillMap(skills=[Echo("a")])
+    registry = get_tool_registry(skill_map)
+    assert get_tool_registry(skill_map) is registry
+
+    # Workflows built on the same SkillMap share the registry.
+    workflow_1 = AgentFlowOpenAI(llm=MagicMock(), skill_map=skill_map)
+    workflow_2 = AgentFlowOpenAI(llm=MagicMock(), skill_map=skill_map)
+    assert workflow_1.tools is registry.tools
+    assert workflow_2.tools is registry.tools
+
+    # Other SkillMaps get their own registry.
+    assert get_tool_registry(SkillMap(skills=[Echo("a")])) is not registry
+
+
+def test_get_tool_registry_invalidated_on_skill_change():
+    skill_map = SkillMap(skills=[Echo("a")])
+    workflow = AgentFlowOpenAI(llm=MagicMock(), skill_map=skill_map)
+    registry = get_tool_registry(skill_map)
+
+    skill_map.add_skill(Echo("b"))
+    assert get_tool_registry(skill_map) is not registry
+    assert [tool.metadata.name for tool in workflow.tools] == ["a", "b"]
+
+    skill_map.remove_skill("a")
+    assert [tool.metadata.name for tool in workflow.tools] == ["b"]
@@ -0,0 +1,80 @@
+import pytest
+import json
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from llama_index.core.llms import ChatMessage
+
+from benchmarks.fake_llm import ScriptedLLM
+from benchmarks.workflow_bench import main, percentiles
+
+
+@pytest.mark.asyncio
+async def test_scripted_llm():
+    llm = ScriptedLLM([[("echo", {"text": "a"})], "done"], latency=lambda: 0.0)
+    messages = [ChatMessage(role="user", content="hi")]
+
+    response = await llm.achat_with_tools(tools=[], messages=messages)
+    tool_calls = llm.get_tool_calls_from_response(response)
+    assert [t.tool_name for t in tool_calls] == ["echo"]
+    assert json.loads(tool_calls[0].tool_kwargs["input"]) == {"text": "a"}
+
+    messages.append(response.message)
+    response = await llm.achat_with_tools(tools=[], messages=messages)
+    assert response.message.content == "done"
+    assert llm.get_tool_calls_from_response(response, error_on_no_tool_call=False) == []
+    with pytest.raises(ValueError):
+        llm.get_tool_calls_from_response(response)
+
+
+def test_percentiles():
+    assert percentiles([]) == {"count": 0}
+    res = percentiles([0.001 * i for i in range(1, 101)])
+    assert res["count"] == 100
+    assert res["p50_ms"] == pytest.approx(51.0)
+    assert res["max_ms"] == pytest.approx(100.0)
+
+
+def test_workflow_bench_main(tmp_path):
+    output = tmp_path / "bench.json"
+    main(
+        [
+            "--runs",
+            "4",
+            "--concurrency",
+            "2",
+            "--memory-sessions",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+    results = json.loads(output.read_text())
+    assert set(results["steps"]) == {"prepare_agent", "router", "tool_call_handler"}
+    assert results["steps"]["router"]["count"] == 8
+    assert results["end_to_end"]["latency"]["count"] == 4
+    assert results["end_to_end"]["workflows_per_s"] > 0
+    assert "memory_per_session_bytes" in results
+    assert results["end_to_end"]["time_to_first_token"] == {"count": 0}
+
+
+def test_workflow_bench_main_stream(tmp_path):
+    output = tmp_path / "bench.json"
+    main(
+        [
+            "--runs",
+            "3",
+            "--memory-sessions",
+            "1",
+            "--stream",
+            "--chunk-latency",
+            "0.001",
+            "--output",
+            str(output),
+        ]
+    )
+    results = json.loads(output.read_text())
+    assert results["config"]["stream"] is True
+    assert results["end_to_end"]["time_to_first_token"]["count"] == 3
@@ -142,7 +142,7 @@ def test_function_call_skill__prepare_function_dict(case_function_call_skill):
                 "type": "object",
                 "properties": {
                     skill_arg.name: {
-                        "type": skill_arg.dtype,
+                        "type": ["string", "integer"],
                         "description": skill_arg.description,
                     }
                 },
@@ -170,7 +170,7 @@ def test_function_call_skill_get_function_dict(case_function_call_skill):
                 "type": "object",
                 "properties": {
                     skill_arg.name: {
-                        "type": skill_arg.dtype,
+                        "type": ["string", "integer"],
                         "description": skill_arg.description,
                     }
                 },
@@ -311,7 +311,7 @@ def test_skill_map_get_combined_function_description_for_agent(case_skill_map):
                     "type": "object",
                     "properties": {
                         "arg1": {
-                            "type": "Union[str, int]",
+                            "type": ["string", "integer"],
                             "description": "This is an argument",
                         }
                     },
@@ -339,5 +339,20 @@ def test_skill_map_get_function_dict_by_name(case_skill_map):
     skill_map: SkillMap = case_skill_map[0]
     assert (
         skill_map.get_function_dict_by_name("test")
-        == "{'name': 'test', 'description': 'This is a test skill', 'parameters': {'type': 'object', 'properties': {'arg1': {'type': 'Union[str, int]', 'description': 'This is an argument'}}, 'required': ['arg1']}}"
+        == '{"description":"This is a test skill","name":"test","parameters":{"properties":{"arg1":{"description":"This is an argument","type":["string","integer"]}},"required":["arg1"],"type":"object"}}'
     )
+    assert skill_map.get_schema_hash_by_name("test") == case_skill_map[1].get_schema_hash()
+
+
+def test_skill_map_add_and_remove_skill(case_skill_map):
+    skill_map: SkillMap = case_skill_map[0]
+    version = skill_map.version
+    skill = MockFunctionCallSkill(name="other", description="Another test skill")
+
+    skill_map.add_skill(skill)
+    assert skill_map.get_function_list() == ["test", "other"]
+    assert skill_map.version == version + 1
+
+    skill_map.remove_skill("test")
+    assert skill_map.get_function_list() == ["other"]
+    assert skill_map.version == version + 2
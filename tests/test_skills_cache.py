@@ -0,0 +1,217 @@
+import pytest
+from unittest.mock import patch
+import asyncio
+import pickle
+import threading
+import time
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skills.base import FunctionCallSkill, FunctionCallSkillAsync, SkillArgAttr
+from src.skills.cache import ResultCache, canonical_key
+
+
+def test_canonical_key():
+    assert canonical_key({"a": 1, "b": [1, 2]}) == canonical_key({"b": [1, 2], "a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": "1"})
+    assert canonical_key({"a": {1, 2}}) == '{"a":"{1, 2}"}'
+
+
+def test_result_cache_call():
+    cache = ResultCache()
+    calls = []
+    assert cache.call("a", lambda: calls.append("a") or "A") == "A"
+    assert cache.call("a", lambda: calls.append("a") or "A") == "A"
+    assert calls == ["a"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 0, "size": 1}
+
+    cache.clear()
+    assert cache.stats()["size"] == 0
+
+
+def test_result_cache_lru():
+    cache = ResultCache(max_size=2)
+    cache.call("a", lambda: "A")
+    cache.call("b", lambda: "B")
+    cache.call("a", lambda: "A")
+    cache.call("c", lambda: "C")
+    assert cache.call("b", lambda: "B2") == "B2"
+    assert cache.call("a", lambda: "A2") == "A2"
+    assert cache.hits == 1
+
+
+def test_result_cache_ttl():
+    cache = ResultCache(ttl=10.0)
+    with patch("src.skills.cache.time.monotonic", return_value=100.0):
+        cache.call("a", lambda: "A")
+    with patch("src.skills.cache.time.monotonic", return_value=105.0):
+        assert cache.call("a", lambda: "A2") == "A"
+    with patch("src.skills.cache.time.monotonic", return_value=110.0):
+        assert cache.call("a", lambda: "A3") == "A3"
+
+
+def test_result_cache_exceptions_not_cached():
+    cache = ResultCache()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.call("a", fail)
+    assert cache.call("a", lambda: "A") == "A"
+    assert cache.misses == 2
+
+
+def test_result_cache_coalesces_threads():
+    cache = ResultCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "A"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.call("a", slow)))
+    owner.start()
+    started.wait()
+    waiter = threading.Thread(target=lambda: results.append(cache.call("a", slow)))
+    waiter.start()
+    while cache.coalesced == 0:
+        time.sleep(0.001)
+    release.set()
+    owner.join()
+    waiter.join()
+    assert results == ["A", "A"]
+    assert calls == [1]
+
+    # Waiters see the owner's exception too.
+    started.clear()
+    release.clear()
+    errors = []
+
+    def slow_fail():
+        started.set()
+        release.wait()
+        raise ValueError("boom")
+
+    def call():
+        try:
+            cache.call("b", slow_fail)
+        except ValueError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    started.wait()
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    while cache.coalesced == 1:
+        time.sleep(0.001)
+    release.set()
+    owner.join()
+    waiter.join()
+    assert len(errors) == 2
+
+
+@pytest.mark.asyncio
+async def test_result_cache_acall():
+    cache = ResultCache()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "A"
+
+    assert await asyncio.gather(cache.acall("a", slow), cache.acall("a", slow)) == [
+        "A",
+        "A",
+    ]
+    assert await cache.acall("a", slow) == "A"
+    assert calls == [1]
+    assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 1, "size": 1}
+
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await cache.acall("b", fail)
+
+    task = asyncio.ensure_future(cache.acall("c", slow))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert await cache.acall("c", slow) == "A"
+
+
+def test_result_cache_pickle():
+    cache = ResultCache(max_size=3, ttl=1.0)
+    cache.call("a", lambda: "A")
+    copy = pickle.loads(pickle.dumps(cache))
+    assert (copy.max_size, copy.ttl) == (3, 1.0)
+    assert copy.stats()["size"] == 0
+
+
+class Lookup(FunctionCallSkill):
+    def __init__(self, **kwargs):
+        super().__init__(
+            name="lookup",
+            description="Look up a key",
+            function_args=[
+                SkillArgAttr(name="key", description="Key", dtype="str", required=True)
+            ],
+            **kwargs,
+        )
+        self.calls = 0
+
+    def execute(self, key: str) -> str:
+        self.calls += 1
+        return key.upper()
+
+
+class LookupAsync(FunctionCallSkillAsync):
+    def __init__(self, **kwargs):
+        super().__init__(
+            name="lookup_async",
+            description="Look up a key",
+            function_args=[
+                SkillArgAttr(name="key", description="Key", dtype="str", required=True)
+            ],
+            **kwargs,
+        )
+        self.calls = 0
+
+    async def execute(self, key: str) -> str:
+        self.calls += 1
+        return key.upper()
+
+
+def test_function_call_skill_cache_results():
+    skill = Lookup()
+    assert skill.result_cache is None
+    skill.handle_router_input({"input": {"key": "a"}})
+    skill.handle_router_input({"input": {"key": "a"}})
+    assert skill.calls == 2
+
+    skill = Lookup(cache_results=True, cache_max_size=10, cache_ttl=60.0)
+    assert skill.handle_router_input({"input": {"key": "a"}}) == "A"
+    assert skill.handle_router_input({"input": {"key": "a"}}) == "A"
+    assert skill.handle_router_input({"input": {"key": "b"}}) == "B"
+    assert skill.calls == 2
+    assert skill.result_cache.stats()["hits"] == 1
+    assert skill.result_cache.max_size == 10
+
+
+@pytest.mark.asyncio
+async def test_function_call_skill_async_cache_results():
+    skill = LookupAsync(cache_results=True)
+    assert await skill.handle_router_input({"input": {"key": "a"}}) == "A"
+    assert await skill.handle_router_input({"input": {"key": "a"}}) == "A"
+    assert skill.calls == 1
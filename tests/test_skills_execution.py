@@ -0,0 +1,157 @@
+import pytest
+import os
+import pickle
+import threading
+
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skills.base import FunctionCallSkill, SkillArgAttr, SkillMap
+from src.skills.errors import SkillExecutionException, SkillTimeoutException
+from src.skills.execution import ExecutionPolicy, SkillExecutor, _invoke_pickled
+
+
+class WhereAmI(FunctionCallSkill):
+    def __init__(self, execution_policy: ExecutionPolicy = ExecutionPolicy.INLINE):
+        super().__init__(
+            name="where_am_i",
+            description="Report the process and thread the skill runs on",
+            function_args=[
+                SkillArgAttr(
+                    name="tag",
+                    description="Tag echoed back",
+                    dtype="str",
+                    required=True,
+                )
+            ],
+            execution_policy=execution_policy,
+        )
+
+    def execute(self, tag: str) -> str:
+        return f"{tag}:{os.getpid()}:{threading.get_ident()}"
+
+
+class Unpicklable(WhereAmI):
+    def __init__(self):
+        super().__init__(execution_policy=ExecutionPolicy.PROCESS)
+        self.lock = threading.Lock()
+
+
+def test_function_call_skill_execution_policy():
+    assert WhereAmI().get_execution_policy() is ExecutionPolicy.INLINE
+    skill = WhereAmI(execution_policy="thread")
+    assert skill.get_execution_policy() is ExecutionPolicy.THREAD
+
+    skill_map = SkillMap(skills=[skill])
+    assert skill_map.get_execution_policy_by_name("where_am_i") is ExecutionPolicy.THREAD
+
+    with pytest.raises(ValueError):
+        WhereAmI(execution_policy="fiber")
+
+
+@pytest.fixture
+def case_skill_executor():
+    executor = SkillExecutor(max_thread_workers=2, max_process_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_skill_executor_inline(case_skill_executor):
+    skill = WhereAmI()
+    res = await case_skill_executor.run(
+        skill.get_function_callable(), {"input": {"tag": "a"}}, ExecutionPolicy.INLINE
+    )
+    assert res == f"a:{os.getpid()}:{threading.get_ident()}"
+
+
+@pytest.mark.asyncio
+async def test_skill_executor_thread(case_skill_executor):
+    skill = WhereAmI(ExecutionPolicy.THREAD)
+    res = await case_skill_executor.run(
+        skill.get_function_callable(), {"input": {"tag": "a"}}, ExecutionPolicy.THREAD
+    )
+    tag, pid, thread = res.split(":")
+    assert int(pid) == os.getpid()
+    assert int(thread) != threading.get_ident()
+    assert case_skill_executor.get_thread_pool()._max_workers == 2
+
+
+@pytest.mark.asyncio
+async def test_skill_executor_process(case_skill_executor):
+    skill = WhereAmI(ExecutionPolicy.PROCESS)
+    res = await case_skill_executor.run(
+        skill.get_function_callable(), {"input": {"tag": "a"}}, ExecutionPolicy.PROCESS
+    )
+    tag, pid, _ = res.split(":")
+    assert tag == "a"
+    assert int(pid) != os.getpid()
+
+    skill = Unpicklable()
+    with pytest.raises(SkillExecutionException):
+        await case_skill_executor.run(
+            skill.get_function_callable(),
+            {"input": {"tag": "a"}},
+            ExecutionPolicy.PROCESS,
+        )
+
+
+def test_skill_executor_shutdown():
+    executor = SkillExecutor()
+    thread_pool = executor.get_thread_pool()
+    assert executor.get_thread_pool() is thread_pool
+    executor.get_process_pool()
+    executor.shutdown()
+    assert executor._thread_pool is None
+    assert executor._process_pool is None
+    executor.shutdown()
+
+
+def test_invoke_pickled():
+    skill = WhereAmI()
+    payload = pickle.dumps((skill.get_function_callable(), {"input": {"tag": "b"}}))
+    assert _invoke_pickled(payload).startswith(f"b:{os.getpid()}:")
+
+
+class Block(FunctionCallSkill):
+    def __init__(self, release: threading.Event, timeout: float = None):
+        super().__init__(
+            name="block",
+            description="Block until released",
+            execution_policy=ExecutionPolicy.THREAD,
+            timeout=timeout,
+        )
+        self.release = release
+
+    def execute(self) -> str:
+        self.release.wait(5)
+        return "released"
+
+
+def test_function_call_skill_timeout():
+    release = threading.Event()
+    assert Block(release).get_timeout() is None
+    skill_map = SkillMap(skills=[Block(release, timeout=1.5)])
+    assert skill_map.get_timeout_by_name("block") == 1.5
+
+
+@pytest.mark.asyncio
+async def test_skill_executor_timeout_abandons_running_call():
+    executor = SkillExecutor(max_thread_workers=1)
+    release = threading.Event()
+    skill = Block(release)
+    with pytest.raises(SkillTimeoutException):
+        await executor.run(skill.get_function_callable(), {}, ExecutionPolicy.THREAD, timeout=0.01)
+    assert executor.abandoned(ExecutionPolicy.THREAD) == 1
+
+    # The only worker is busy, a queued call that times out is dropped, not abandoned.
+    with pytest.raises(SkillTimeoutException, match="0.01 seconds"):
+        await executor.run(skill.get_function_callable(), {}, ExecutionPolicy.THREAD, timeout=0.01)
+    assert executor.abandoned(ExecutionPolicy.THREAD) == 1
+
+    release.set()
+    res = await executor.run(skill.get_function_callable(), {}, ExecutionPolicy.THREAD, timeout=1.0)
+    assert res == "released"
+    assert executor.abandoned(ExecutionPolicy.THREAD) == 0
+    executor.shutdown()
@@ -0,0 +1,65 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skills.results import READ_TOOL_RESULT_SKILL_NAME, ReadToolResult, ResultStore
+
+
+def test_result_store_small_results_unchanged():
+    store = ResultStore(spill_threshold_chars=10)
+    assert store.spill("short") == "short"
+    assert len(store) == 0
+    store.close()
+    assert not os.path.exists(store.directory)
+
+
+def test_result_store_spill_and_read():
+    store = ResultStore(spill_threshold_chars=10, excerpt_chars=4)
+    content = "abcdefghijklmnopqrstuvwxyz"
+    excerpt = store.spill(content)
+    handle = store.store(content)
+    assert len(store) == 1
+    assert f'handle "{handle}"' in excerpt
+    assert "26 characters" in excerpt
+    assert READ_TOOL_RESULT_SKILL_NAME in excerpt
+    assert excerpt.endswith("\nabcd")
+
+    assert store.read(handle, 4, 3) == "[Characters 4-7 of 26]\nefg"
+    assert store.read(handle, 20, 100) == "[Characters 20-26 of 26]\nuvwxyz"
+    assert store.read(handle, -5, 2) == "[Characters 0-2 of 26]\nab"
+    assert store.read("missing") == 'Error: unknown result handle "missing"'
+    store.close()
+
+
+def test_result_store_unicode_offsets():
+    store = ResultStore(spill_threshold_chars=1)
+    handle = store.store("héllo wörld")
+    assert store.read(handle, 6, 5) == "[Characters 6-11 of 11]\nwörld"
+    store.close()
+
+
+def test_result_store_evicts_least_recently_used(tmp_path):
+    store = ResultStore(directory=str(tmp_path), max_results=2)
+    a = store.store("a" * 10)
+    b = store.store("b" * 10)
+    store.read(a)
+    c = store.store("c" * 10)
+    assert len(store) == 2
+    assert store.read(b).startswith("Error")
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{a}.txt", f"{c}.txt"])
+
+    store.close()
+    assert os.listdir(tmp_path) == []
+    assert len(store) == 0
+
+
+def test_read_tool_result_skill():
+    store = ResultStore(spill_threshold_chars=5)
+    handle = store.store("0123456789")
+    skill = ReadToolResult(store)
+    assert skill.name == READ_TOOL_RESULT_SKILL_NAME
+    result = skill.handle_router_input({"input": {"handle": handle, "offset": 2, "length": 3}})
+    assert result == "[Characters 2-5 of 10]\n234"
+    assert skill.handle_router_input({"input": {"handle": handle}}).endswith("0123456789")
+    store.close()
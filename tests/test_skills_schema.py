@@ -0,0 +1,99 @@
+import pytest
+import hashlib
+import json
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skills.base import SkillArgAttr
+from src.skills.schema import canonical_json, compile_skill_schema, dtype_to_json_schema
+
+
+@pytest.mark.parametrize(
+    "dtype, expected",
+    [
+        ("str", {"type": "string"}),
+        ("int", {"type": "integer"}),
+        ("float", {"type": "number"}),
+        ("bool", {"type": "boolean"}),
+        ("Any", {}),
+        ("bytes", {}),
+        ("list", {"type": "array"}),
+        ("dict", {"type": "object"}),
+        ("typing.Mapping", {"type": "object"}),
+        ("typing.Sequence", {"type": "array"}),
+        ("Union[int, float]", {"type": ["integer", "number"]}),
+        ("int | float | int", {"type": ["integer", "number"]}),
+        ("Optional[str]", {"type": ["string", "null"]}),
+        ("Union[str, bytes]", {}),
+        (
+            "Optional[list[int]]",
+            {"anyOf": [{"type": "array", "items": {"type": "integer"}}, {"type": "null"}]},
+        ),
+        ("list[str]", {"type": "array", "items": {"type": "string"}}),
+        ("list[Any]", {"type": "array"}),
+        ("set[int]", {"type": "array", "items": {"type": "integer"}, "uniqueItems": True}),
+        ("tuple[float, ...]", {"type": "array", "items": {"type": "number"}}),
+        (
+            "tuple[int, str]",
+            {
+                "type": "array",
+                "prefixItems": [{"type": "integer"}, {"type": "string"}],
+                "minItems": 2,
+                "maxItems": 2,
+            },
+        ),
+        ("dict[str, float]", {"type": "object", "additionalProperties": {"type": "number"}}),
+        ("dict[str, Any]", {"type": "object"}),
+        ("typing.Counter[str]", {"type": "object"}),
+        ("Literal['a', 'b']", {"enum": ["a", "b"], "type": "string"}),
+        ("Literal['a', 1]", {"enum": ["a", 1]}),
+        ("Literal[None]", {"enum": [None], "type": "null"}),
+        ("type[int]", {}),
+        ("typing.ClassVar[int]", {}),
+        ("typing.Callable[[int], int]", {}),
+    ],
+)
+def test_dtype_to_json_schema(dtype, expected):
+    assert dtype_to_json_schema(dtype) == expected
+
+
+def test_dtype_to_json_schema_returns_copies():
+    schema = dtype_to_json_schema("list[int]")
+    schema["items"]["type"] = "string"
+    assert dtype_to_json_schema("list[int]") == {"type": "array", "items": {"type": "integer"}}
+
+
+def test_canonical_json():
+    assert canonical_json({"b": 1, "a": "é"}) == '{"a":"é","b":1}'.encode("utf-8")
+    assert canonical_json({"a": {3, 1, 2}}) == b'{"a":[1,2,3]}'
+    assert canonical_json({"a": b"x"}) == b'{"a":"b\'x\'"}'
+
+
+def test_compile_skill_schema():
+    function_args = [
+        SkillArgAttr(name="query", dtype="str", description="Search query", required=True),
+        SkillArgAttr(name="limit", dtype="int", description="Maximum results", default=10),
+        SkillArgAttr(name="tags", dtype="Optional[list[str]]", description="Tags"),
+    ]
+    schema = compile_skill_schema("search", "Search documents", function_args)
+    function = schema.function_dict["function"]
+    assert schema.function_dict["type"] == "function"
+    assert function["parameters"]["properties"] == {
+        "query": {"type": "string", "description": "Search query"},
+        "limit": {"type": "integer", "description": "Maximum results", "default": 10},
+        "tags": {
+            "anyOf": [{"type": "array", "items": {"type": "string"}}, {"type": "null"}],
+            "description": "Tags",
+        },
+    }
+    assert function["parameters"]["required"] == ["query"]
+    assert json.loads(schema.serialized) == function
+    assert schema.content_hash == hashlib.sha256(schema.serialized).hexdigest()
+
+    # Deterministic: the same definition always gives the same bytes and hash.
+    again = compile_skill_schema("search", "Search documents", list(function_args))
+    assert again.serialized == schema.serialized
+    assert again.content_hash == schema.content_hash
+    assert compile_skill_schema("search", "Other", function_args).content_hash != schema.content_hash
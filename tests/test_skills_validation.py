@@ -0,0 +1,154 @@
+import pickle
+import pytest
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.skills.base import SkillArgAttr
+from src.skills.errors import SkillArgException, SkillInputException
+from src.skills.validation import ArgValidator, compile_dtype, resolve_dtype
+
+
+def test_resolve_dtype():
+    assert resolve_dtype("int") is int
+    assert resolve_dtype("Union[int, float]") is resolve_dtype("Union[int, float]")
+
+    with pytest.raises(SkillArgException):
+        resolve_dtype('"invalid"')
+
+    with pytest.raises(SkillArgException):
+        resolve_dtype("c * x = Union[str, int], gser [] lkasd")
+
+
+def test_compile_dtype_any():
+    check = compile_dtype("Any")
+    assert check(None) is True
+    assert check(object()) is True
+    assert compile_dtype("dict[str, Any]")({"a": None}) is True
+
+
+def test_compile_dtype_is_cached():
+    assert compile_dtype("Union[str, int]") is compile_dtype("Union[str, int]")
+
+
+@pytest.mark.parametrize(
+    "dtype, good, bad",
+    [
+        ("int", 1, "1"),
+        ("Optional[int]", None, "1"),
+        ("List", [1, "a"], (1,)),
+        ("Union[int, float]", 1.5, "1.5"),
+        ("int | str", "a", 1.5),
+        ("Optional[int]", None, 1.5),
+        ("list", [1, "a"], (1,)),
+        ("list[int]", [1, 2], [1, "2"]),
+        ("List[str]", ["a"], "a"),
+        ("set[int]", {1, 2}, {1, "2"}),
+        ("dict[str, float]", {"a": 1.5}, {"a": "1.5"}),
+        ("dict[str, float]", {"a": 1.5}, {1: 1.5}),
+        ("Optional[list[str]]", None, [1]),
+        ("Union[list[int], str]", [1], [1.5]),
+        ("tuple[int, ...]", (1, 2, 3), (1, "2")),
+        ("tuple[int, str]", (1, "a"), (1, "a", 2)),
+        ("Literal['a', 'b']", "a", "c"),
+        ("Literal[1]", 1, True),
+        ("type[int]", int, 1),
+    ],
+)
+def test_compile_dtype_checks(dtype, good, bad):
+    check = compile_dtype(dtype)
+    assert check(good) is True
+    assert check(bad) is False
+
+
+def test_compile_dtype_unsupported():
+    with pytest.raises(SkillArgException):
+        compile_dtype("TypeVar('T')")
+
+    with pytest.raises(SkillArgException):
+        compile_dtype("Final[int]")
+
+    with pytest.raises(SkillArgException):
+        compile_dtype("list[TypeVar('T')]")
+
+
+def test_skill_arg_attr_generic_dtype():
+    skill_arg = SkillArgAttr(
+        name="arg1",
+        dtype="list[int]",
+        description="This is an argument",
+        required=False,
+        default=[1, 2],
+    )
+    assert skill_arg.default == [1, 2]
+
+    with pytest.raises(SkillArgException):
+        SkillArgAttr(
+            name="arg1",
+            dtype="list[int]",
+            description="This is an argument",
+            required=False,
+            default=["a"],
+        )
+
+
+@pytest.fixture
+def case_arg_validator() -> ArgValidator:
+    return ArgValidator(
+        [
+            SkillArgAttr(
+                name="a",
+                dtype="dict[str, float]",
+                description="This is an argument",
+                required=True,
+            ),
+            SkillArgAttr(
+                name="b",
+                dtype="Optional[list[int]]",
+                description="This is an argument",
+                required=False,
+                default=[1],
+            ),
+        ]
+    )
+
+
+def test_arg_validator_validate(case_arg_validator):
+    validator: ArgValidator = case_arg_validator
+
+    assert validator.validate({"input": {"a": {"x": 1.5}}}) == {
+        "a": {"x": 1.5},
+        "b": [1],
+    }
+    assert validator.validate({"input": {"a": {}, "b": None}}) == {"a": {}, "b": None}
+
+    with pytest.raises(SkillInputException):
+        validator.validate({"a": {}})
+
+    with pytest.raises(SkillInputException):
+        validator.validate({"input": "a"})
+
+    with pytest.raises(SkillInputException) as e:
+        validator.validate({"input": {"b": [1]}})
+    assert e.value.message == 'Invalid input: missing required argument "a"'
+
+    with pytest.raises(SkillInputException) as e:
+        validator.validate({"input": {"a": {"x": "y"}}})
+    assert (
+        e.value.message
+        == 'Invalid input: argument "a" must be of type dict[str, float]'
+    )
+
+
+def test_arg_validator_no_args():
+    assert ArgValidator([]).validate({}) == {}
+
+
+def test_arg_validator_pickle(case_arg_validator):
+    validator: ArgValidator = pickle.loads(pickle.dumps(case_arg_validator))
+    assert validator.validate({"input": {"a": {"x": 1.5}}}) == {
+        "a": {"x": 1.5},
+        "b": [1],
+    }